@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Before anything that reads or changes the response body.
+    'bridges.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -83,6 +86,39 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Local memory is per process; the production profile uses a shared backend so
+# invalidation of cached analytics reaches every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+# Sessions and authentication
+# Every view is login-protected, so each request reads the session and the
+# user. DJANGO_SESSION_MODE picks the session store:
+#   cached_db       cache first, database as fallback (default)
+#   signed_cookies  no server-side storage; a logout cannot revoke a copied
+#                   cookie before it expires
+#   db              Django's default, one SELECT per request
+# Users and permission sets are cached by bridges.auth.CachedModelBackend and
+# dropped on user and group changes. That is only seen by processes sharing
+# the cache; settings_production.py covers running several nodes.
+
+SESSION_BACKENDS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_BACKENDS[os.environ.get('DJANGO_SESSION_MODE', 'cached_db')]
+
+AUTHENTICATION_BACKENDS = ['bridges.auth.CachedModelBackend']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -133,3 +169,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
+
+
+# Background jobs (bridges/jobs.py, run with `manage.py run_workers`)
+
+BRIDGES_JOB_MODULES = ['bridges.tasks']
+
+
+# Completed maintenance records older than this move to the archive table
+# (bridges/archive.py, `manage.py archive_maintenance` or the
+# 'maintenance.archive' job).
+
+BRIDGES_MAINTENANCE_ARCHIVE_DAYS = 730
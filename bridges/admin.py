@@ -1,11 +1,17 @@
 from django.contrib import admin
-from .models import Bridge, TrafficData, MaintenanceRecord
+from .models import Bridge, TrafficData, MaintenanceRecord, ArchivedMaintenanceRecord, MaintenanceArchiveSummary, Route, Job, PhotoBlob, PhotoAttachment, SyncChange, LoadScreening, ConditionCubeCell
+
+
+@admin.register(Route)
+class RouteAdmin(admin.ModelAdmin):
+    list_display = ['name', 'created_at']
+    search_fields = ['name']
 
 
 @admin.register(Bridge)
 class BridgeAdmin(admin.ModelAdmin):
     list_display = ['name', 'bridge_type', 'length', 'width', 'lanes', 'year_built', 'condition_category']
-    list_filter = ['bridge_type', 'material', 'year_built']
+    list_filter = ['bridge_type', 'material', 'year_built', 'normalized_route']
     search_fields = ['name', 'route']
     readonly_fields = ['created_at', 'updated_at']
 
@@ -22,4 +28,65 @@ class MaintenanceRecordAdmin(admin.ModelAdmin):
     list_display = ['bridge', 'action_type', 'scheduled_date', 'is_completed', 'cost']
     list_filter = ['action_type', 'is_completed', 'scheduled_date']
     search_fields = ['bridge__name', 'description']
-    date_hierarchy = 'scheduled_date'
\ No newline at end of file
+    date_hierarchy = 'scheduled_date'
+
+
+@admin.register(ArchivedMaintenanceRecord)
+class ArchivedMaintenanceRecordAdmin(admin.ModelAdmin):
+    list_display = ['bridge', 'action_type', 'scheduled_date', 'completed_date', 'cost', 'archived_at']
+    list_filter = ['action_type', 'completed_date']
+    search_fields = ['bridge__name', 'description']
+    date_hierarchy = 'scheduled_date'
+    raw_id_fields = ['bridge']
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(MaintenanceArchiveSummary)
+class MaintenanceArchiveSummaryAdmin(admin.ModelAdmin):
+    list_display = ['bridge', 'record_count', 'total_cost', 'last_completed_date', 'updated_at']
+    search_fields = ['bridge__name']
+    raw_id_fields = ['bridge']
+
+
+@admin.register(LoadScreening)
+class LoadScreeningAdmin(admin.ModelAdmin):
+    list_display = ['bridge', 'load_index', 'demand', 'capacity', 'heavy_share', 'heavy_per_lane', 'screened_at']
+    search_fields = ['bridge__name']
+    readonly_fields = ['screened_at']
+
+
+@admin.register(ConditionCubeCell)
+class ConditionCubeCellAdmin(admin.ModelAdmin):
+    list_display = ['bridge_type', 'material', 'decade', 'lanes', 'bridge_count', 'maintenance_cost', 'refreshed_at']
+    list_filter = ['bridge_type', 'material', 'decade', 'lanes']
+
+
+@admin.register(PhotoBlob)
+class PhotoBlobAdmin(admin.ModelAdmin):
+    list_display = ['sha256', 'content_type', 'size', 'width', 'height', 'thumbnails_ready', 'created_at']
+    list_filter = ['thumbnails_ready', 'content_type']
+    search_fields = ['sha256']
+    readonly_fields = ['sha256', 'file', 'size', 'created_at']
+
+
+@admin.register(PhotoAttachment)
+class PhotoAttachmentAdmin(admin.ModelAdmin):
+    list_display = ['bridge', 'caption', 'maintenance_record', 'uploaded_by', 'created_at']
+    search_fields = ['bridge__name', 'caption', 'original_filename']
+    raw_id_fields = ['blob', 'maintenance_record']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['task', 'status', 'priority', 'attempts', 'progress', 'run_after', 'finished_at']
+    list_filter = ['status', 'task']
+    search_fields = ['task', 'error']
+    readonly_fields = ['created_at', 'updated_at', 'locked_by', 'locked_at', 'finished_at']
+
+
+@admin.register(SyncChange)
+class SyncChangeAdmin(admin.ModelAdmin):
+    list_display = ['seq', 'model', 'object_id', 'deleted', 'changed_at']
+    list_filter = ['model', 'deleted']
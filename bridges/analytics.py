@@ -0,0 +1,129 @@
+"""
+Database-side condition analytics.
+
+``Bridge.average_rating`` and ``Bridge.condition_category`` are Python
+properties, which forces grouping and filtering to load every bridge. The
+expressions here compute the same values in SQL so reports can be single
+grouped queries. Results are cached until the next write to a bridge, its
+traffic data or its maintenance records (see ``bridges/signals.py``).
+"""
+from django.core.cache import cache
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.lookups import Exact, GreaterThanOrEqual
+
+from .models import MaintenanceRecord, Route
+
+RATING_FIELDS = ['deck_rating', 'girders_rating', 'piers_rating', 'abutment_rating']
+
+# Lower bound of the average rating for each category, best first; mirrors
+# Bridge.condition_category.
+CONDITION_THRESHOLDS = [
+    ('EXCELLENT', 4.5),
+    ('VERY_GOOD', 3.5),
+    ('GOOD', 2.5),
+    ('FAIR', 1.5),
+    ('POOR', 0),
+]
+CONDITION_CATEGORIES = [category for category, _ in CONDITION_THRESHOLDS]
+
+CACHE_VERSION_KEY = 'bridges:analytics:version'
+CACHE_TIMEOUT = 60 * 10
+
+
+def average_rating_expression(prefix=''):
+    """SQL equivalent of ``Bridge.average_rating`` (NULL when nothing is rated).
+
+    ``prefix`` is a relation path such as ``'bridges__'`` for use from a
+    related model.
+    """
+    total = sum(
+        (Coalesce(F(prefix + field), 0) for field in RATING_FIELDS[1:]),
+        start=Coalesce(F(prefix + RATING_FIELDS[0]), 0),
+    )
+    rated = sum(
+        (Case(When(**{prefix + field + '__isnull': False}, then=1), default=0) for field in RATING_FIELDS[1:]),
+        start=Case(When(**{prefix + RATING_FIELDS[0] + '__isnull': False}, then=1), default=0),
+    )
+    return Cast(total, FloatField()) / Cast(NullIf(rated, 0), FloatField())
+
+
+def condition_category_expression(prefix=''):
+    """SQL equivalent of ``Bridge.condition_category`` as a key such as 'VERY_GOOD'."""
+    average = average_rating_expression(prefix)
+    return Case(
+        *[
+            When(GreaterThanOrEqual(average, Value(threshold)), then=Value(category))
+            for category, threshold in CONDITION_THRESHOLDS
+        ],
+        default=Value('UNKNOWN'),
+    )
+
+
+def version():
+    """Current cache version; every write to the inventory changes it."""
+    current = cache.get(CACHE_VERSION_KEY)
+    if current is None:
+        current = 1
+        cache.add(CACHE_VERSION_KEY, current, None)
+    return current
+
+
+def invalidate():
+    """Drop every cached analytics result; called on writes to the inventory."""
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, 2, None)
+
+
+def cached(name, compute, timeout=CACHE_TIMEOUT):
+    key = f'bridges:analytics:{name}:{version()}'
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result, timeout)
+    return result
+
+
+# --- Corridor analytics ---
+
+def corridor_queryset():
+    """Per-route bridge count, condition mix, traffic load and open maintenance.
+
+    One grouped query: traffic is one-to-one with bridges so it can be joined,
+    while open maintenance is a correlated subquery to avoid multiplying the
+    bridge rows by their maintenance records.
+    """
+    category = condition_category_expression('bridges__')
+    open_maintenance = (
+        MaintenanceRecord.objects.filter(bridge__normalized_route=OuterRef('pk'), is_completed=False)
+        .order_by()
+        .values('bridge__normalized_route')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    condition_counts = {
+        category_name.lower(): Count('bridges', filter=Exact(category, Value(category_name)))
+        for category_name in CONDITION_CATEGORIES
+    }
+    return (
+        Route.objects.annotate(
+            bridge_count=Count('bridges'),
+            heavy_vehicles=Coalesce(Sum('bridges__traffic__heavy_vehicles'), 0),
+            small_vehicles=Coalesce(Sum('bridges__traffic__small_vehicles'), 0),
+            open_maintenance=Coalesce(Subquery(open_maintenance, output_field=IntegerField()), 0),
+            **condition_counts,
+        )
+        .filter(bridge_count__gt=0)
+        .order_by('-heavy_vehicles', 'name')
+    )
+
+
+def corridor_report():
+    """``corridor_queryset()`` as plain dicts, cached between inventory writes."""
+    fields = [
+        'id', 'name', 'bridge_count', 'heavy_vehicles', 'small_vehicles', 'open_maintenance',
+        *[category.lower() for category in CONDITION_CATEGORIES],
+    ]
+    return cached('corridors', lambda: list(corridor_queryset().values(*fields)))
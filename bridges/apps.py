@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BridgesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bridges'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
@@ -0,0 +1,144 @@
+"""
+Hot/cold archival of completed maintenance records.
+
+Pages mostly deal with open or recent work, so ``MaintenanceRecord`` keeps
+only those. Completed records older than ``BRIDGES_MAINTENANCE_ARCHIVE_DAYS``
+move to ``ArchivedMaintenanceRecord`` in primary-key batches. Each batch adds
+its counts and costs to the bridges' ``MaintenanceArchiveSummary`` rows in
+the same transaction, so totals built from both (dashboard, condition cube)
+do not change. Records with photo attachments stay put, because deleting
+them would delete the attachments too.
+
+``maintenance_history()`` unions both tables when full history is needed.
+Offline tablets sync only the hot table, so they see archived records as
+deletions.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, Sum, Value
+from django.utils import timezone
+
+from . import analytics, signals, sync
+from .models import ArchivedMaintenanceRecord, MaintenanceArchiveSummary, MaintenanceRecord
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 730
+
+# Shared by both tables, in model field order so the two SELECTs line up.
+HISTORY_FIELDS = [
+    'id', 'bridge', 'action_type', 'description', 'scheduled_date', 'completed_date',
+    'cost', 'is_completed', 'created_at', 'updated_at',
+]
+
+
+def archive_after_days():
+    return getattr(settings, 'BRIDGES_MAINTENANCE_ARCHIVE_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+
+
+def archivable(older_than_days=None):
+    """Hot records eligible for archiving."""
+    days = archive_after_days() if older_than_days is None else older_than_days
+    cutoff = timezone.localdate() - timedelta(days=days)
+    return MaintenanceRecord.objects.filter(
+        is_completed=True,
+        completed_date__lt=cutoff,
+        photos__isnull=True,
+    )
+
+
+def _move(records):
+    """Copy ``records`` to the archive, update summaries and delete the originals."""
+    ArchivedMaintenanceRecord.objects.bulk_create([
+        ArchivedMaintenanceRecord(**{
+            field.attname: getattr(record, field.attname)
+            for field in MaintenanceRecord._meta.concrete_fields
+        })
+        for record in records
+    ])
+
+    totals = {}
+    for record in records:
+        count, cost, last = totals.get(record.bridge_id, (0, Decimal('0'), None))
+        totals[record.bridge_id] = (
+            count + 1,
+            cost + (record.cost or 0),
+            max(filter(None, (last, record.completed_date)), default=None),
+        )
+    summaries = {
+        summary.bridge_id: summary
+        for summary in MaintenanceArchiveSummary.objects.select_for_update().filter(bridge_id__in=totals)
+    }
+    now = timezone.now()
+    created = []
+    for bridge_id, (count, cost, last) in totals.items():
+        summary = summaries.get(bridge_id)
+        if summary is None:
+            summary = MaintenanceArchiveSummary(bridge_id=bridge_id)
+            created.append(summary)
+        summary.record_count += count
+        summary.total_cost += cost
+        summary.last_completed_date = max(filter(None, (summary.last_completed_date, last)), default=None)
+        summary.updated_at = now
+    MaintenanceArchiveSummary.objects.bulk_create(created)
+    MaintenanceArchiveSummary.objects.bulk_update(
+        list(summaries.values()), ['record_count', 'total_cost', 'last_completed_date', 'updated_at']
+    )
+
+    ids = [record.pk for record in records]
+    # Totals are unchanged, so the per-row cube and analytics handlers have
+    # nothing to do; the sync log gets one write for the whole batch.
+    with signals.inventory_signals_suppressed():
+        MaintenanceRecord.objects.filter(pk__in=ids).delete()
+    sync.log_changes(MaintenanceRecord, ids, deleted=True)
+
+
+def archive_completed(older_than_days=None, batch_size=500, progress=None):
+    """Archive every eligible record, one transaction per batch.
+
+    ``progress``, if given, is called with the running total after each
+    batch. Returns the number of records archived.
+    """
+    candidates = archivable(older_than_days).order_by('pk')
+    archived = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(candidates.filter(pk__gt=last_pk).select_for_update(of=('self',))[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            _move(batch)
+        archived += len(batch)
+        if progress:
+            progress(archived)
+    if archived:
+        analytics.invalidate()
+    return archived
+
+
+def maintenance_history(bridge=None):
+    """Hot and archived records, newest scheduled first, as one UNION query.
+
+    Rows come back as ``MaintenanceRecord`` instances with an ``archived``
+    flag; archived ones cannot be saved back. Filter with ``bridge`` here
+    since a union can only be ordered and sliced afterwards.
+    """
+    hot = MaintenanceRecord.objects.order_by()
+    cold = ArchivedMaintenanceRecord.objects.order_by()
+    if bridge is not None:
+        hot = hot.filter(bridge=bridge)
+        cold = cold.filter(bridge=bridge)
+    hot = hot.only(*HISTORY_FIELDS).annotate(archived=Value(False, output_field=BooleanField()))
+    cold = cold.only(*HISTORY_FIELDS).annotate(archived=Value(True, output_field=BooleanField()))
+    return hot.union(cold, all=True).order_by('-scheduled_date', '-id')
+
+
+def maintenance_totals():
+    """Record counts across both tables: ``{'total': n, 'completed': n}``."""
+    archived = MaintenanceArchiveSummary.objects.aggregate(count=Sum('record_count'))['count'] or 0
+    return {
+        'total': MaintenanceRecord.objects.count() + archived,
+        'completed': MaintenanceRecord.objects.filter(is_completed=True).count() + archived,
+    }
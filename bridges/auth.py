@@ -0,0 +1,68 @@
+"""
+Authentication backend that caches users and permission sets.
+
+Every page is login-protected, so ``ModelBackend`` costs a user SELECT per
+request, plus permission queries whenever a template or the admin checks
+``perms``. ``CachedModelBackend`` keeps both in the default cache:
+
+* the user, keyed by primary key, dropped when the user is saved or deleted;
+* the permission set, keyed by user and a permissions version, dropped with
+  the user or when their groups or direct permissions change. Changes to a
+  group (or to its permissions) bump the version, which retires every
+  cached permission set at once.
+
+The handlers are connected in ``bridges/signals.py``. Invalidation only
+reaches processes that share the cache, so the production profile falls back
+to ``ModelBackend`` when it runs on several nodes (``DJANGO_MULTI_NODE``).
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_TIMEOUT = 300
+PERMISSIONS_VERSION_KEY = 'bridges:auth:perms-version'
+
+
+def _user_key(user_id):
+    return f'bridges:auth:user:{user_id}'
+
+
+def _permissions_key(user_id):
+    return f'bridges:auth:perms:{user_id}:{cache.get_or_set(PERMISSIONS_VERSION_KEY, 1, None)}'
+
+
+def invalidate_user(user_id):
+    """Forget the cached user and permission set for ``user_id``."""
+    cache.delete_many([_user_key(user_id), _permissions_key(user_id)])
+
+
+def invalidate_permissions():
+    """Forget every cached permission set; called on group changes."""
+    try:
+        cache.incr(PERMISSIONS_VERSION_KEY)
+    except ValueError:
+        cache.set(PERMISSIONS_VERSION_KEY, 2, None)
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = _user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, USER_TIMEOUT)
+        elif not self.user_can_authenticate(user):
+            return None
+        return user
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            key = _permissions_key(user_obj.pk)
+            permissions = cache.get(key)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, permissions, USER_TIMEOUT)
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
@@ -0,0 +1,244 @@
+"""
+Condition aggregation cube for drill-down reporting.
+
+``ConditionCubeCell`` holds sums for every combination of bridge type,
+material, decade built and lane count. Any breakdown over those dimensions is
+a roll-up of a few hundred cells at most, whatever the size of the inventory.
+
+Cells are built with grouped queries over bridges with their traffic,
+maintenance records and archived-maintenance summaries. Writes mark the affected cells dirty and they are
+recomputed once when the transaction commits; ``rebuild()`` (the
+``rebuild_condition_cube`` command or ``cube.rebuild`` job) recomputes the
+whole cube for scheduled refreshes and after bulk imports and records it in
+``ConditionCubeBuild``. Until that first full build the cells are
+incomplete, so incremental refreshes are skipped and the cube is never
+built inside a request: ``ensure_built()`` queues the job instead.
+"""
+import threading
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact
+from django.utils import timezone
+
+from . import analytics
+from .jobs import enqueue
+from .models import (
+    Bridge, ConditionCubeBuild, ConditionCubeCell, Job, MaintenanceArchiveSummary, MaintenanceRecord,
+)
+
+DIMENSIONS = ['bridge_type', 'material', 'decade', 'lanes']
+
+CONDITION_MEASURES = {category: f'{category.lower()}_count' for category in analytics.CONDITION_CATEGORIES}
+MEASURES = [
+    'bridge_count', 'rated_count', 'rating_sum', *CONDITION_MEASURES.values(),
+    'heavy_vehicles', 'small_vehicles', 'traffic_count', 'maintenance_count', 'maintenance_cost',
+]
+
+_local = threading.local()
+
+
+def decade_expression(prefix=''):
+    return ExpressionWrapper(F(prefix + 'year_built') / 10 * 10, output_field=IntegerField())
+
+
+def cell_key(bridge_type, material, year_built, lanes):
+    return (bridge_type, material, year_built // 10 * 10, lanes)
+
+
+def _key_filter(keys, prefix=''):
+    q = Q()
+    for bridge_type, material, decade, lanes in keys:
+        q |= Q(**{
+            prefix + 'bridge_type': bridge_type,
+            prefix + 'material': material,
+            prefix + 'year_built__gte': decade,
+            prefix + 'year_built__lt': decade + 10,
+            prefix + 'lanes': lanes,
+        })
+    return q
+
+
+def compute_cells(keys=None):
+    """Return ``{key: measures}`` for ``keys`` (or every cell), from three grouped queries."""
+    bridges = Bridge.objects.order_by()
+    records = MaintenanceRecord.objects.order_by()
+    summaries = MaintenanceArchiveSummary.objects.order_by()
+    if keys is not None:
+        bridges = bridges.filter(_key_filter(keys))
+        records = records.filter(_key_filter(keys, 'bridge__'))
+        summaries = summaries.filter(_key_filter(keys, 'bridge__'))
+
+    average = analytics.average_rating_expression()
+    category = analytics.condition_category_expression()
+    condition_counts = {
+        field: Count('pk', filter=Exact(category, Value(name)))
+        for name, field in CONDITION_MEASURES.items()
+    }
+    bridge_rows = (
+        bridges.annotate(decade=decade_expression())
+        .values(*DIMENSIONS)
+        .annotate(
+            bridge_count=Count('pk'),
+            rated_count=Count(average),
+            rating_sum=Coalesce(Sum(average), 0.0),
+            heavy_vehicles=Coalesce(Sum('traffic__heavy_vehicles'), 0),
+            small_vehicles=Coalesce(Sum('traffic__small_vehicles'), 0),
+            traffic_count=Count('traffic'),
+            **condition_counts,
+        )
+    )
+    cells = {}
+    for row in bridge_rows:
+        key = tuple(row.pop(dimension) for dimension in DIMENSIONS)
+        cells[key] = dict(row, maintenance_count=0, maintenance_cost=Decimal('0'))
+
+    record_rows = (
+        records.annotate(decade=decade_expression('bridge__'))
+        .values('bridge__bridge_type', 'bridge__material', 'decade', 'bridge__lanes')
+        .annotate(
+            maintenance_count=Count('pk'),
+            maintenance_cost=Coalesce(Sum('cost'), Value(Decimal('0')), output_field=DecimalField()),
+        )
+    )
+    # Archived records (bridges/archive.py) count through their per-bridge summaries.
+    archived_rows = (
+        summaries.annotate(decade=decade_expression('bridge__'))
+        .values('bridge__bridge_type', 'bridge__material', 'decade', 'bridge__lanes')
+        .annotate(
+            maintenance_count=Coalesce(Sum('record_count'), 0),
+            maintenance_cost=Coalesce(Sum('total_cost'), Value(Decimal('0')), output_field=DecimalField()),
+        )
+    )
+    for row in [*record_rows, *archived_rows]:
+        key = (row['bridge__bridge_type'], row['bridge__material'], row['decade'], row['bridge__lanes'])
+        if key in cells:
+            cells[key]['maintenance_count'] += row['maintenance_count']
+            cells[key]['maintenance_cost'] += row['maintenance_cost']
+    return cells
+
+
+def rebuild():
+    """Recompute every cell. Returns the number of cells."""
+    cells = compute_cells()
+    with transaction.atomic():
+        ConditionCubeCell.objects.all().delete()
+        ConditionCubeCell.objects.bulk_create([
+            ConditionCubeCell(**dict(zip(DIMENSIONS, key)), **measures)
+            for key, measures in cells.items()
+        ], batch_size=500)
+        ConditionCubeBuild.objects.update_or_create(
+            pk=1, defaults={'built_at': timezone.now(), 'cell_count': len(cells)}
+        )
+    return len(cells)
+
+
+def is_built():
+    """Whether the cube has had a full build, so its cells cover every bridge."""
+    return ConditionCubeBuild.objects.exists()
+
+
+def ensure_built():
+    """Queue a full build if the cube has never been fully built but there are bridges.
+
+    Returns the queued or already running ``cube.rebuild`` job, or None if
+    the cube is ready (or there is nothing to put in it).
+    """
+    if is_built() or not Bridge.objects.exists():
+        return None
+    pending = Job.objects.filter(
+        task='cube.rebuild', status__in=[Job.STATUS_QUEUED, Job.STATUS_RUNNING],
+    ).first()
+    return pending or enqueue('cube.rebuild', priority=5)
+
+
+def refresh(keys):
+    """Recompute only the cells for ``keys``, removing any that became empty.
+
+    Does nothing before the first full build, which will cover these keys.
+    """
+    keys = set(keys)
+    if not keys or not is_built():
+        return
+    cells = compute_cells(keys)
+    with transaction.atomic():
+        for key in keys:
+            lookup = dict(zip(DIMENSIONS, key))
+            if key in cells:
+                ConditionCubeCell.objects.update_or_create(defaults=cells[key], **lookup)
+            else:
+                ConditionCubeCell.objects.filter(**lookup).delete()
+
+
+# --- Incremental maintenance on writes ---
+
+def _pending():
+    if not hasattr(_local, 'keys'):
+        _local.keys = set()
+    return _local.keys
+
+
+def _flush():
+    keys, _local.keys = _pending(), set()
+    refresh(keys)
+
+
+def mark_dirty(*keys):
+    """Schedule the cells for ``keys`` to be recomputed when the transaction commits.
+
+    Keys dirtied by many writes in one transaction (e.g. a bridge delete
+    cascading to its records) are refreshed once. Every call schedules a
+    flush, so keys left over from a rolled-back transaction are still handled.
+    """
+    keys = {key for key in keys if key is not None}
+    if not keys:
+        return
+    _pending().update(keys)
+    transaction.on_commit(_flush)
+
+
+def key_for_bridge(bridge_id):
+    row = Bridge.objects.filter(pk=bridge_id).values_list('bridge_type', 'material', 'year_built', 'lanes').first()
+    return cell_key(*row) if row else None
+
+
+# --- Drill-down queries ---
+
+def pivot(group_by=(), **filters):
+    """Roll the cube up to ``group_by`` dimensions, optionally filtered by dimension values.
+
+    Returns ``(rows, totals)`` where each row holds the group's dimension
+    values plus counts, condition mix, averages and sums.
+    """
+    cells = ConditionCubeCell.objects.filter(**filters)
+    sums = {measure: Sum(measure) for measure in MEASURES}
+    if group_by:
+        rows = [
+            _finish(row)
+            for row in cells.values(*group_by).annotate(**sums).order_by(*group_by)
+        ]
+    else:
+        rows = []
+    totals = _finish(cells.aggregate(**sums))
+    return rows, totals
+
+
+def _finish(row):
+    row = {key: (value if value is not None else 0) for key, value in row.items()}
+    rated = row['rated_count']
+    average = row['rating_sum'] / rated if rated else None
+    row['average_rating'] = round(average, 2) if average is not None else None
+    # Bridge.bci_percentage is the average rating as a percentage of 5.
+    row['average_bci'] = round(average * 20, 1) if average is not None else None
+    row['average_daily_traffic'] = (
+        round((row['heavy_vehicles'] + row['small_vehicles']) / row['traffic_count'])
+        if row['traffic_count'] else None
+    )
+    row['maintenance_cost'] = float(row['maintenance_cost'])
+    row['condition'] = {
+        category.lower(): row.pop(field) for category, field in CONDITION_MEASURES.items()
+    }
+    del row['rating_sum']
+    return row
@@ -0,0 +1,106 @@
+"""
+Serving files from disk with conditional GET and single byte-range support.
+
+Used for inspection photos so browsers can revalidate with a 304 instead of
+re-downloading, and resume or partially fetch large originals.
+"""
+import os
+import re
+
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """Return ``(start, end)`` inclusive for a single byte range.
+
+    Returns ``None`` when the header should be ignored (malformed or multiple
+    ranges; a full 200 response is allowed then) and ``False`` when the range
+    cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _if_range_passes(request, etag, last_modified):
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _read_chunks(fh, length):
+    with fh:
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, path, content_type, etag=None, cache_control=None):
+    """Serve ``path`` honouring If-None-Match/If-Modified-Since and Range.
+
+    ``etag`` must be a quoted strong validator; it defaults to one derived from
+    the file's mtime and size. ``cache_control`` is passed to
+    ``patch_cache_control`` on every response, including 304s.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404('File not found')
+
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = etag or f'"{last_modified:x}-{size:x}"'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        byte_range = None
+        range_header = request.headers.get('Range')
+        if range_header and request.method == 'GET' and _if_range_passes(request, etag, last_modified):
+            byte_range = parse_range(range_header, size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+        elif byte_range:
+            start, end = byte_range
+            fh = open(path, 'rb')
+            fh.seek(start)
+            response = StreamingHttpResponse(
+                _read_chunks(fh, end - start + 1), status=206, content_type=content_type
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if cache_control:
+        patch_cache_control(response, **cache_control)
+    return response
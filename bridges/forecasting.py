@@ -0,0 +1,143 @@
+"""
+Markov-chain forecasts of network condition.
+
+Bridges are grouped by bridge type, material and year built, starting from
+the condition category of their current component ratings. Each year every
+group's state distribution is multiplied by an age-dependent transition
+matrix; all groups are propagated together as one stacked matrix product, so
+the cost depends on the number of groups and years, not on the number of
+bridges.
+
+The annual deterioration rates below are engineering defaults. Replace them
+with rates fitted from inspection history once enough re-inspections exist.
+"""
+from datetime import date
+
+import numpy as np
+from django.db.models import Count
+
+from . import analytics
+from .models import Bridge
+
+# Best to worst; index into the state vector.
+STATES = analytics.CONDITION_CATEGORIES
+DEFAULT_HORIZONS = (5, 10, 20)
+MAX_HORIZON = 100
+
+# Annual probability of a bridge dropping one condition state, by material...
+MATERIAL_RATES = {
+    'STEEL_CONCRETE': 0.05,
+    'CONCRETE': 0.04,
+    'STEEL': 0.06,
+}
+# ...scaled by bridge type...
+TYPE_MULTIPLIERS = {
+    'BEAM_COMPOSITE': 1.0,
+    'SUSPENSION': 1.2,
+    'ARCH': 0.9,
+    'TRUSS': 1.1,
+}
+DEFAULT_RATE = 0.05
+# ...and by age: rates rise linearly until AGE_SATURATION years, by up to
+# AGE_MAX_MULTIPLIER.
+AGE_SATURATION = 60
+AGE_MAX_MULTIPLIER = 2.5
+
+
+def _lookup(values, table, default):
+    keys, inverse = np.unique(values, return_inverse=True)
+    return np.array([table.get(key, default) for key in keys], dtype=float)[inverse]
+
+
+def load_groups():
+    """Return group attributes and their (groups x states) starting counts.
+
+    One grouped query; bridges without any rating are counted separately
+    because they have no starting state.
+    """
+    rows = (
+        Bridge.objects.order_by()
+        .annotate(condition=analytics.condition_category_expression())
+        .values('bridge_type', 'material', 'year_built', 'condition')
+        .annotate(count=Count('pk'))
+    )
+    groups = {}
+    unrated = 0
+    for row in rows:
+        if row['condition'] not in STATES:
+            unrated += row['count']
+            continue
+        key = (row['bridge_type'], row['material'], row['year_built'])
+        groups.setdefault(key, np.zeros(len(STATES)))[STATES.index(row['condition'])] += row['count']
+
+    keys = list(groups)
+    return {
+        'bridge_type': np.array([key[0] for key in keys], dtype=str),
+        'material': np.array([key[1] for key in keys], dtype=str),
+        'year_built': np.array([key[2] for key in keys], dtype=float),
+        'counts': np.array([groups[key] for key in keys]).reshape(len(keys), len(STATES)),
+        'unrated': unrated,
+    }
+
+
+def annual_rates(groups, age):
+    base = _lookup(groups['material'], MATERIAL_RATES, DEFAULT_RATE)
+    base *= _lookup(groups['bridge_type'], TYPE_MULTIPLIERS, 1.0)
+    age_multiplier = 1 + (AGE_MAX_MULTIPLIER - 1) * np.clip(age / AGE_SATURATION, 0, 1)
+    return np.clip(base * age_multiplier, 0, 1)
+
+
+def transition_matrices(rates):
+    """Stack of (groups x states x states) one-year transition matrices.
+
+    A bridge stays put with probability 1 - p or drops one state with
+    probability p; the worst state is absorbing (no repairs are modelled).
+    """
+    n = len(STATES)
+    matrices = np.zeros((len(rates), n, n))
+    index = np.arange(n - 1)
+    matrices[:, index, index] = 1 - rates[:, None]
+    matrices[:, index, index + 1] = rates[:, None]
+    matrices[:, n - 1, n - 1] = 1
+    return matrices
+
+
+def forecast(horizons=DEFAULT_HORIZONS, start_year=None):
+    """Expected number of bridges in each condition state after each horizon (years)."""
+    horizons = sorted(set(horizons))
+    start_year = start_year or date.today().year
+    groups = load_groups()
+    distribution = groups['counts']
+
+    results = {0: distribution.sum(axis=0)}
+    for year in range(1, max(horizons, default=0) + 1):
+        age = np.maximum(start_year + year - groups['year_built'], 0)
+        matrices = transition_matrices(annual_rates(groups, age))
+        distribution = np.einsum('gi,gij->gj', distribution, matrices)
+        if year in horizons:
+            results[year] = distribution.sum(axis=0)
+
+    fair_or_poor = [STATES.index('FAIR'), STATES.index('POOR')]
+    return {
+        'start_year': start_year,
+        'rated_bridges': int(groups['counts'].sum()),
+        'unrated_bridges': groups['unrated'],
+        'horizons': [
+            {
+                'years': years,
+                'year': start_year + years,
+                'distribution': {
+                    state.lower(): round(float(count), 1) for state, count in zip(STATES, totals)
+                },
+                'fair_or_poor': round(float(totals[fair_or_poor].sum()), 1),
+            }
+            for years, totals in sorted(results.items())
+        ],
+    }
+
+
+def network_forecast(horizons=DEFAULT_HORIZONS):
+    """``forecast()`` cached until the next inventory write."""
+    horizons = tuple(sorted(set(horizons)))
+    key = 'forecast:' + ','.join(str(h) for h in horizons)
+    return analytics.cached(key, lambda: forecast(horizons))
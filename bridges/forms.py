@@ -1,5 +1,5 @@
 from django import forms
-from .models import Bridge, TrafficData, MaintenanceRecord
+from .models import Bridge, TrafficData, MaintenanceRecord, PhotoAttachment
 
 
 ## 1. BridgeForm (No Change Needed - Good as Is)
@@ -87,3 +87,26 @@ class MaintenanceRecordForm(forms.ModelForm):
             self.add_error('completed_date', "Completion date cannot be before the scheduled date.")
             
         return cleaned_data
+
+
+## 4. PhotoAttachmentForm
+# The uploaded file is stored by bridges.photos.store_upload(); the view sets
+# 'bridge' and 'blob'. Only maintenance records of the same bridge are offered.
+class PhotoAttachmentForm(forms.ModelForm):
+    image = forms.ImageField(widget=forms.ClearableFileInput(attrs={'class': 'form-input', 'accept': 'image/*'}))
+
+    class Meta:
+        model = PhotoAttachment
+        fields = ['image', 'caption', 'maintenance_record']
+        widgets = {
+            'caption': forms.TextInput(attrs={'class': 'form-input', 'placeholder': 'e.g. Spalling on pier 2'}),
+            'maintenance_record': forms.Select(attrs={'class': 'form-select'}),
+        }
+
+    def __init__(self, *args, bridge=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        records = MaintenanceRecord.objects.none()
+        if bridge is not None:
+            records = bridge.maintenance_records.all()
+        self.fields['maintenance_record'].queryset = records
+        self.fields['maintenance_record'].required = False
@@ -0,0 +1,221 @@
+"""
+Lightweight background job queue stored in the application database.
+
+There is no external broker in our deployment, so jobs are plain ``Job`` rows.
+Views call ``enqueue()`` and hand the job id back to the browser, which polls
+the ``job_status`` endpoint; ``manage.py run_workers`` claims and runs them.
+
+Tasks are registered with the ``@task`` decorator in the modules listed in
+``settings.BRIDGES_JOB_MODULES`` and are called as ``func(job, **kwargs)`` so
+they can report progress with ``job.set_progress(percent, message)``.
+"""
+import importlib
+import json
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Seconds; the retry delay doubles with each failed attempt.
+RETRY_BACKOFF_BASE = 10
+# A RUNNING job that has neither finished nor reported progress within this
+# window is assumed to belong to a dead worker and is put back on the queue.
+# Tasks that can run longer must call job.set_progress() more often.
+STALE_AFTER = timedelta(minutes=30)
+# Seconds between checks for such jobs while workers are running.
+STALE_CHECK_INTERVAL = 60
+
+_registry = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+class InvalidResult(Exception):
+    """A task returned a value that cannot be stored as JSON."""
+
+
+def task(name):
+    """Register ``func`` under ``name`` so workers can run it."""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def load_tasks():
+    for module in getattr(settings, 'BRIDGES_JOB_MODULES', ['bridges.tasks']):
+        importlib.import_module(module)
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownTask(f"No task registered as '{name}'")
+
+
+def enqueue(task_name, *, priority=0, max_attempts=3, delay=None, **kwargs):
+    """Queue ``task_name`` to run in a worker and return the ``Job`` row.
+
+    ``kwargs`` must be JSON-serialisable. The job is only visible to workers
+    once the surrounding transaction (if any) commits.
+    """
+    run_after = timezone.now() + delay if delay else timezone.now()
+    return Job.objects.create(
+        task=task_name,
+        kwargs=kwargs,
+        priority=priority,
+        max_attempts=max_attempts,
+        run_after=run_after,
+    )
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _claimable():
+    return Job.objects.filter(
+        status=Job.STATUS_QUEUED,
+        run_after__lte=timezone.now(),
+    ).order_by('-priority', 'run_after', 'pk')
+
+
+def claim_next(worker_id):
+    """Atomically move the next runnable job to RUNNING and return it.
+
+    On backends with ``SKIP LOCKED`` (Postgres) concurrent workers never block
+    on each other's rows. Elsewhere (SQLite) we pick a candidate and claim it
+    with a conditional UPDATE; if another worker got there first the UPDATE
+    touches no rows and we try the next candidate.
+    """
+    now = timezone.now()
+    claim = {
+        'status': Job.STATUS_RUNNING,
+        'locked_by': worker_id,
+        'locked_at': now,
+        'updated_at': now,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _claimable().select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            Job.objects.filter(pk=job.pk).update(attempts=job.attempts + 1, **claim)
+        return Job.objects.get(pk=job.pk)
+
+    for pk, attempts in _claimable().values_list('pk', 'attempts')[:10]:
+        claimed = Job.objects.filter(pk=pk, status=Job.STATUS_QUEUED).update(
+            attempts=attempts + 1, **claim
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    """Execute a claimed job and record its outcome, scheduling retries on failure.
+
+    The outcome is only written while the job is still this worker's claim:
+    if it was given up as stale and claimed again, the newer run's record
+    stands.
+    """
+    try:
+        func = get_task(job.task)
+        result = func(job, **job.kwargs)
+        try:
+            json.dumps(result)
+        except (TypeError, ValueError) as exc:
+            raise InvalidResult(f"Task '{job.task}' returned a result that is not JSON-serialisable") from exc
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.task, job.attempts)
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts and not isinstance(exc, (UnknownTask, InvalidResult)):
+            job.status = Job.STATUS_QUEUED
+            job.run_after = timezone.now() + timedelta(
+                seconds=RETRY_BACKOFF_BASE * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = timezone.now()
+    else:
+        job.status = Job.STATUS_SUCCEEDED
+        job.result = result
+        job.error = ''
+        job.progress = 100
+        job.finished_at = timezone.now()
+
+    claimed = Job.objects.filter(
+        pk=job.pk, status=Job.STATUS_RUNNING, locked_by=job.locked_by, attempts=job.attempts,
+    ).update(
+        status=job.status, result=job.result, error=job.error, progress=job.progress,
+        run_after=job.run_after, locked_by='', locked_at=None, finished_at=job.finished_at,
+        updated_at=timezone.now(),
+    )
+    if not claimed:
+        logger.warning(
+            "Job %s (%s) was reclaimed while attempt %s ran; its outcome is discarded",
+            job.pk, job.task, job.attempts,
+        )
+    job.locked_by = ''
+    job.locked_at = None
+    return job
+
+
+def requeue_stale(older_than=STALE_AFTER):
+    """Recover RUNNING jobs abandoned by crashed workers.
+
+    Jobs with attempts left go back on the queue. The rest are marked
+    FAILED, so a job that kills its worker (say, out of memory) is not
+    retried forever. Returns ``(requeued, failed)``.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING, locked_at__lt=now - older_than)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.STATUS_FAILED,
+        error='The worker stopped while running the last attempt.',
+        locked_by='', locked_at=None, finished_at=now, updated_at=now,
+    )
+    requeued = stale.update(status=Job.STATUS_QUEUED, locked_by='', locked_at=None, updated_at=now)
+    return requeued, failed
+
+
+def work(worker_id=None, poll_interval=1.0, burst=False, should_stop=lambda: False, requeue_interval=None):
+    """Claim and run jobs until ``should_stop()`` is true.
+
+    With ``burst`` the loop exits as soon as the queue is empty. With
+    ``requeue_interval`` (seconds) the loop also calls ``requeue_stale()``
+    that often; ``run_workers`` uses it when there is no supervisor process.
+    Returns the number of jobs processed.
+    """
+    load_tasks()
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    next_requeue = time.monotonic()
+    while not should_stop():
+        if requeue_interval is not None and time.monotonic() >= next_requeue:
+            requeue_stale()
+            next_requeue = time.monotonic() + requeue_interval
+        job = claim_next(worker_id)
+        if job is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,204 @@
+"""
+Live dashboard updates over Server-Sent Events.
+
+Each process has one ``Broadcaster``. When the inventory changes it
+recomputes the dashboard statistics once (``dashboard_snapshot()``), diffs
+them against the previous snapshot and queues the delta for every open
+stream. A change costs one computation, however many dashboards are open.
+
+Writes made in this process wake the broadcaster right after commit
+(``notify()``, connected in ``bridges/signals.py``). Writes made by other
+workers, job processes or bulk operations are picked up by polling the
+shared analytics cache version, which every inventory write bumps.
+
+Streams need the ASGI application (``bridge_inventory.asgi``); see
+gunicorn.conf.py.
+"""
+import asyncio
+import contextvars
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.db.models import Avg, Count
+from django.urls import reverse
+
+from . import analytics, archive
+from .models import Bridge, MaintenanceRecord, TrafficData
+
+# How often to check for writes made by other processes.
+POLL_INTERVAL = 5
+# Comment lines keep proxies from closing an idle stream.
+KEEPALIVE_INTERVAL = 15
+# Browser reconnect delay after a dropped stream, in milliseconds.
+RETRY_MS = 5000
+# A stream that falls this far behind is resynchronised with a full snapshot.
+QUEUE_SIZE = 32
+RECENT_MAINTENANCE = 5
+
+
+def dashboard_snapshot():
+    """The dashboard's statistics, as JSON-serialisable data."""
+    total_bridges = Bridge.objects.count()
+    by_category = dict(
+        Bridge.objects.order_by()
+        .annotate(category=analytics.condition_category_expression())
+        .values_list('category')
+        .annotate(count=Count('pk'))
+    )
+    condition_stats = {}
+    for category in analytics.CONDITION_CATEGORIES:
+        count = by_category.get(category, 0)
+        condition_stats[category.lower()] = {
+            'count': count,
+            'percentage': round(count / total_bridges * 100, 1) if total_bridges else 0.0,
+        }
+
+    traffic = TrafficData.objects.aggregate(avg_heavy=Avg('heavy_vehicles'), avg_small=Avg('small_vehicles'))
+    maintenance = archive.maintenance_totals()
+    recent = MaintenanceRecord.objects.select_related('bridge').order_by('-created_at')[:RECENT_MAINTENANCE]
+
+    return {
+        'total_bridges': total_bridges,
+        'condition_stats': condition_stats,
+        'avg_daily_traffic': int((traffic['avg_heavy'] or 0) + (traffic['avg_small'] or 0)),
+        'total_maintenance_actions': maintenance['total'],
+        'completion_rate': (
+            round(maintenance['completed'] / maintenance['total'] * 100, 1) if maintenance['total'] else 0
+        ),
+        'recent_maintenance': [
+            {
+                'id': record.pk,
+                'bridge_name': record.bridge.name,
+                'bridge_url': reverse('bridge_detail', args=[record.bridge_id]),
+                'action': record.get_action_type_display(),
+                'is_completed': record.is_completed,
+            }
+            for record in recent
+        ],
+    }
+
+
+def diff(previous, current):
+    """The parts of ``current`` that differ from ``previous``."""
+    delta = {}
+    for key, value in current.items():
+        if key == 'condition_stats':
+            changed = {
+                category: stats for category, stats in value.items()
+                if previous[key].get(category) != stats
+            }
+            if changed:
+                delta[key] = changed
+        elif previous.get(key) != value:
+            delta[key] = value
+    return delta
+
+
+def format_event(event, data, event_id):
+    return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+def _compute():
+    # Runs outside the request cycle, so expired connections are not
+    # closed for us.
+    close_old_connections()
+    return analytics.version(), dashboard_snapshot()
+
+
+class Broadcaster:
+    def __init__(self):
+        self._loop = None
+
+    def _bind(self):
+        """(Re)initialise for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._changed = asyncio.Event()
+            self._lock = asyncio.Lock()
+            self._subscribers = set()
+            self._task = None
+            self._snapshot = None
+            self._version = None
+            self._event_id = 0
+
+    def notify(self):
+        """Wake the broadcaster after a local write. Safe to call from any thread."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._changed.set)
+
+    async def subscribe(self):
+        """Register a stream; returns ``(queue, event_id, snapshot)``."""
+        self._bind()
+        async with self._lock:
+            if self._snapshot is None:
+                self._version, self._snapshot = await sync_to_async(_compute)()
+        queue = asyncio.Queue(QUEUE_SIZE)
+        self._subscribers.add(queue)
+        if self._task is None:
+            # A fresh context, so the task does not hold on to the
+            # per-request state of whichever stream started it.
+            self._task = contextvars.Context().run(asyncio.ensure_future, self._run())
+        return queue, self._event_id, self._snapshot
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    async def _run(self):
+        try:
+            while self._subscribers:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    if await sync_to_async(analytics.version)() == self._version:
+                        continue
+                self._changed.clear()
+                await self._refresh()
+        finally:
+            # Nobody is watching for changes any more, so the next
+            # subscriber must not be handed this snapshot.
+            self._task = None
+            self._snapshot = None
+
+    async def _refresh(self):
+        async with self._lock:
+            previous = self._snapshot
+            self._version, self._snapshot = await sync_to_async(_compute)()
+            delta = diff(previous, self._snapshot)
+            if not delta:
+                return
+            self._event_id += 1
+            for queue in self._subscribers:
+                if queue.full():
+                    # Too far behind for deltas to be applied in order.
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait((self._event_id, 'snapshot', self._snapshot))
+                else:
+                    queue.put_nowait((self._event_id, 'delta', delta))
+
+
+broadcaster = Broadcaster()
+
+
+def notify():
+    broadcaster.notify()
+
+
+async def event_stream():
+    """Server-Sent Events for one dashboard: a snapshot, then deltas."""
+    queue, event_id, snapshot = await broadcaster.subscribe()
+    try:
+        yield f'retry: {RETRY_MS}\n' + format_event('snapshot', snapshot, event_id)
+        while True:
+            try:
+                event_id, event, data = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(event, data, event_id)
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -0,0 +1,301 @@
+"""
+Concurrent load testing over HTTP.
+
+``run()`` drives a weighted mix of scenarios against a running server from
+many simulated users. Each user is a thread with its own keep-alive
+connection and logged-in session. Users pick scenarios at random by weight
+until the time is up. The first ``warmup`` seconds are not recorded, so
+cold caches and connection setup do not skew the numbers.
+
+Scenarios are named after the URL they request. ``summarise()`` reports
+throughput, latency percentiles and error rate per URL name, and
+``compare()`` checks a report against a saved baseline.
+``manage.py loadtest`` starts gunicorn against a seeded database and
+runs all of this.
+"""
+import http.client
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date
+from http.cookies import SimpleCookie
+from math import ceil
+from urllib.parse import urlencode, urlsplit
+
+from django.urls import reverse
+
+from .models import Bridge, MaintenanceRecord, Route
+
+DEFAULT_MIX = {
+    'bridge_list': 30,
+    'bridge_detail': 25,
+    'dashboard': 20,
+    'maintenance_record_create': 10,
+    'traffic_data_manage': 15,
+}
+
+CONDITIONS = ['EXCELLENT', 'VERY_GOOD', 'GOOD', 'FAIR', 'POOR']
+ACTIONS = [action for action, _ in MaintenanceRecord.ACTION_TYPES]
+PAGE_SIZE = 10
+
+# Connection failures worth one retry on a fresh connection: the server
+# closes idle keep-alive connections and recycles workers.
+RECONNECT_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class LoadTestError(Exception):
+    pass
+
+
+def scenario_data(search_terms=20):
+    """IDs and search terms for the scenarios, read from the target database."""
+    bridges = list(Bridge.objects.order_by('pk').values_list('pk', flat=True))
+    names = list(Bridge.objects.order_by('?').values_list('name', flat=True)[:search_terms])
+    return {
+        'bridges': bridges,
+        'routes': list(Route.objects.filter(bridges__isnull=False).distinct().values_list('pk', flat=True)),
+        # Exact names, the numeric part alone (matches several), and a miss.
+        'search': [*names, *{name.split()[-1] for name in names}, 'no such bridge'],
+    }
+
+
+# --- Scenarios ---
+# Each returns (method, path, form fields or None, expected statuses).
+
+def bridge_list(rng, data):
+    params = {}
+    kind = rng.choice(['page', 'search', 'condition', 'route'])
+    if kind == 'page':
+        pages = max(1, ceil(len(data['bridges']) / PAGE_SIZE))
+        params['page'] = rng.randint(1, min(pages, 20))
+    elif kind == 'search':
+        params['search'] = rng.choice(data['search'])
+    elif kind == 'condition':
+        params['condition'] = rng.choice(CONDITIONS)
+    elif data['routes']:
+        params['route'] = rng.choice(data['routes'])
+    return 'GET', f"{reverse('bridge_list')}?{urlencode(params)}", None, (200,)
+
+
+def bridge_detail(rng, data):
+    return 'GET', reverse('bridge_detail', args=[rng.choice(data['bridges'])]), None, (200,)
+
+
+def dashboard(rng, data):
+    return 'GET', reverse('dashboard'), None, (200,)
+
+
+def maintenance_record_create(rng, data):
+    fields = {
+        'action_type': rng.choice(ACTIONS),
+        'description': 'Load test',
+        'scheduled_date': date.today().isoformat(),
+    }
+    return 'POST', reverse('maintenance_record_create', args=[rng.choice(data['bridges'])]), fields, (302,)
+
+
+def traffic_data_manage(rng, data):
+    fields = {
+        'heavy_vehicles': rng.randint(0, 3000),
+        'small_vehicles': rng.randint(100, 20000),
+    }
+    return 'POST', reverse('traffic_data_manage', args=[rng.choice(data['bridges'])]), fields, (302,)
+
+
+SCENARIOS = {
+    'bridge_list': bridge_list,
+    'bridge_detail': bridge_detail,
+    'dashboard': dashboard,
+    'maintenance_record_create': maintenance_record_create,
+    'traffic_data_manage': traffic_data_manage,
+}
+
+
+def parse_mix(text):
+    """``'dashboard=20,bridge_list=30'`` -> ``{'dashboard': 20, 'bridge_list': 30}``."""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}'; choose from {', '.join(SCENARIOS)}")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise ValueError(f"Weight for '{name}' must be an integer") from None
+    return mix
+
+
+class VirtualUser:
+    """One browser: a keep-alive connection, a cookie jar and a session."""
+
+    def __init__(self, base_url, timeout=30):
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.timeout = timeout
+        self.cookies = {}
+        self.connection = None
+
+    def request(self, method, path, fields=None):
+        """Send one request and read the whole response; returns ``(status, body)``."""
+        headers = {'Accept-Encoding': 'gzip'}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        body = None
+        if fields is not None:
+            fields = dict(fields, csrfmiddlewaretoken=self.cookies.get('csrftoken', ''))
+            body = urlencode(fields)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body, headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except RECONNECT_ERRORS:
+                self.close()
+                if attempt == 2:
+                    raise
+            except Exception:
+                self.close()
+                raise
+
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        if response.will_close:
+            self.close()
+        return response.status, content
+
+    def login(self, username, password):
+        login_url = reverse('login')
+        self.request('GET', login_url)
+        status, _ = self.request('POST', login_url, {'username': username, 'password': password})
+        if status != 302:
+            raise LoadTestError(f'Login as {username!r} failed with status {status}')
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarise(samples, duration):
+    """Per-URL-name statistics from ``(name, seconds, error)`` samples.
+
+    ``error`` is ``None`` for a success, otherwise a short reason such as
+    ``'status 500'``. The ``'TOTAL'`` entry covers every request.
+    """
+    groups = defaultdict(list)
+    for sample in samples:
+        groups[sample[0]].append(sample)
+        groups['TOTAL'].append(sample)
+
+    results = {}
+    for name, group in sorted(groups.items()):
+        latencies = sorted(seconds * 1000 for _, seconds, _ in group)
+        failures = Counter(error for _, _, error in group if error)
+        errors = sum(failures.values())
+        results[name] = {
+            'requests': len(group),
+            'rps': round(len(group) / duration, 2),
+            'errors': errors,
+            'error_rate': round(errors / len(group), 4),
+            'mean_ms': round(sum(latencies) / len(latencies), 1),
+            'p50_ms': round(percentile(latencies, 50), 1),
+            'p95_ms': round(percentile(latencies, 95), 1),
+            'p99_ms': round(percentile(latencies, 99), 1),
+            'max_ms': round(latencies[-1], 1),
+            'failures': dict(failures.most_common(5)),
+        }
+    return results
+
+
+def _drive(user, mix, data, rng, record_from, stop_at, samples):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while True:
+        name = rng.choices(names, weights)[0]
+        method, path, fields, expected = SCENARIOS[name](rng, data)
+        started = time.perf_counter()
+        if started >= stop_at:
+            return
+        try:
+            status, _ = user.request(method, path, fields)
+            error = None if status in expected else f'status {status}'
+        except (OSError, http.client.HTTPException) as exc:
+            error = type(exc).__name__
+        if started >= record_from:
+            samples.append((name, time.perf_counter() - started, error))
+
+
+def run(base_url, username, password, data, clients=10, duration=30, warmup=5, mix=None, seed=0, timeout=30):
+    """Drive ``clients`` concurrent users against ``base_url``.
+
+    Every user logs in first; measurement starts once all of them have.
+    Returns the ``summarise()`` results for the ``duration`` seconds after
+    ``warmup``.
+    """
+    mix = mix or DEFAULT_MIX
+    if not data['bridges']:
+        raise LoadTestError('The target database has no bridges to request')
+
+    users = [VirtualUser(base_url, timeout) for _ in range(clients)]
+    for user in users:
+        user.login(username, password)
+
+    start = time.perf_counter()
+    record_from = start + warmup
+    stop_at = record_from + duration
+    per_user = [[] for _ in users]
+    threads = [
+        threading.Thread(
+            target=_drive,
+            args=(user, mix, data, random.Random(f'{seed}-{index}'), record_from, stop_at, per_user[index]),
+            daemon=True,
+        )
+        for index, user in enumerate(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for user in users:
+        user.close()
+
+    # A request started just before the end is still counted, so the window
+    # is measured rather than assumed.
+    elapsed = max(time.perf_counter() - record_from, duration)
+    return summarise([sample for samples in per_user for sample in samples], elapsed)
+
+
+def compare(results, baseline, max_regression):
+    """Regressions of ``results`` against ``baseline`` results, as messages.
+
+    A URL name regresses when its throughput falls, or its p95 latency
+    rises, by more than ``max_regression`` percent, or when any of its
+    requests failed: baselines are only saved from error-free runs.
+    """
+    problems = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if base['rps'] and current['rps'] < base['rps'] * (1 - max_regression / 100):
+            problems.append(f"{name}: throughput {current['rps']} req/s vs {base['rps']} req/s")
+        if base['p95_ms'] and current['p95_ms'] > base['p95_ms'] * (1 + max_regression / 100):
+            problems.append(f"{name}: p95 {current['p95_ms']} ms vs {base['p95_ms']} ms")
+        if current['errors']:
+            problems.append(f"{name}: {current['errors']} failed requests ({current['error_rate']:.2%})")
+    return problems
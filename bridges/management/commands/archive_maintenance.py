@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from bridges.archive import archivable, archive_after_days, archive_completed
+
+
+class Command(BaseCommand):
+    help = 'Move completed maintenance records older than the archive age to the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=None,
+            help='Archive records completed more than this many days ago '
+                 '(default: BRIDGES_MAINTENANCE_ARCHIVE_DAYS)',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Only count the eligible records')
+
+    def handle(self, *args, **options):
+        days = options['older_than_days']
+        if days is None:
+            days = archive_after_days()
+        if options['dry_run']:
+            self.stdout.write(f'{archivable(days).count()} record(s) completed more than {days} days ago')
+            return
+        archived = archive_completed(
+            older_than_days=days,
+            batch_size=options['batch_size'],
+            progress=lambda count: self.stdout.write(f'  {count} archived'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} maintenance record(s)'))
@@ -0,0 +1,63 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bridges import sync
+from bridges.models import MaintenanceRecord
+from bridges.sampledata import create_sample_network
+
+
+class Command(BaseCommand):
+    help = 'Compare delta sync payload size against a full export (runs in a rolled-back transaction)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bridges', type=int, default=2000, help='Size of the synthetic network')
+        parser.add_argument('--changed', type=int, default=25, help='Bridges edited while the tablet is offline')
+        parser.add_argument('--deleted', type=int, default=5, help='Maintenance records deleted while offline')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def measure(self, since):
+        """Pull every page after ``since`` like a tablet would."""
+        requests = records = raw = compressed = 0
+        started = time.perf_counter()
+        more = True
+        while more:
+            page, since, more = sync.changes_since(since, sync.MAX_PAGE_SIZE)
+            requests += 1
+            records += len(page)
+            raw += len(sync.encode_jsonl(page, compress=False))
+            compressed += len(sync.encode_jsonl(page))
+        elapsed = (time.perf_counter() - started) * 1000
+        return requests, records, raw, compressed, elapsed
+
+    def run(self, options):
+        bridges = create_sample_network(options['bridges'], name_prefix='Sync Benchmark Bridge')
+        watermark = sync.latest_seq()
+
+        # A week of field activity while the tablet is offline.
+        for bridge in bridges[:options['changed']]:
+            bridge.condition_notes = 'Re-inspected'
+            bridge.save()
+            bridge.traffic.heavy_vehicles += 10
+            bridge.traffic.save()
+            MaintenanceRecord.objects.create(
+                bridge=bridge, action_type='INSPECTION',
+                description='Follow-up inspection', scheduled_date=date.today(),
+            )
+        for record in MaintenanceRecord.objects.filter(bridge__in=bridges[-options['deleted']:])[:options['deleted']]:
+            record.delete()
+
+        full = self.measure(0)
+        delta = self.measure(watermark)
+
+        self.stdout.write(f"{'':<14}{'requests':>10}{'records':>10}{'raw bytes':>14}{'gzip bytes':>14}{'ms':>10}")
+        for label, (requests, records, raw, compressed, elapsed) in (('full export', full), ('delta sync', delta)):
+            self.stdout.write(f'{label:<14}{requests:>10}{records:>10}{raw:>14,}{compressed:>14,}{elapsed:>10.1f}')
+        ratio = full[3] / delta[3] if delta[3] else float('inf')
+        self.stdout.write(self.style.SUCCESS(f'Delta payload is {ratio:.0f}x smaller than a full export'))
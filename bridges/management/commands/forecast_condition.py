@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from bridges import forecasting
+
+
+class Command(BaseCommand):
+    help = 'Forecast how many bridges will be in each condition state in future years'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'horizons', nargs='*', type=int, default=list(forecasting.DEFAULT_HORIZONS),
+            help='Years ahead to forecast (default: 5 10 20)'
+        )
+
+    def handle(self, *args, **options):
+        result = forecasting.forecast(options['horizons'])
+        states = [state.lower() for state in forecasting.STATES]
+
+        self.stdout.write(f"{'year':<8}" + ''.join(f'{state:>12}' for state in states) + f"{'fair+poor':>12}")
+        for horizon in result['horizons']:
+            counts = ''.join(f"{horizon['distribution'][state]:>12.1f}" for state in states)
+            self.stdout.write(f"{horizon['year']:<8}{counts}{horizon['fair_or_poor']:>12.1f}")
+        if result['unrated_bridges']:
+            self.stdout.write(self.style.WARNING(f"{result['unrated_bridges']} unrated bridge(s) excluded"))
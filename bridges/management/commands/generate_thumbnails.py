@@ -0,0 +1,43 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from bridges.models import PhotoBlob
+from bridges.photos import generate_thumbnails_for_id
+
+
+def _init_worker():
+    # Each process needs its own database connection.
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Generate missing photo thumbnails across a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate thumbnails for every photo')
+        parser.add_argument('--processes', type=int, default=None, help='Pool size (default: CPU count)')
+
+    def handle(self, *args, **options):
+        blobs = PhotoBlob.objects.all()
+        if not options['all']:
+            blobs = blobs.filter(thumbnails_ready=False)
+        blob_ids = list(blobs.values_list('pk', flat=True))
+        if not blob_ids:
+            self.stdout.write('No thumbnails to generate.')
+            return
+
+        connections.close_all()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['processes'], initializer=_init_worker) as pool:
+            futures = {pool.submit(generate_thumbnails_for_id, pk): pk for pk in blob_ids}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'Photo {futures[future]}: {exc}')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated thumbnails for {done} photo(s), {failed} failed'))
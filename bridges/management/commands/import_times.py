@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a gunicorn worker does before serving its first request.
+BOOT_SCRIPT = """
+import sys
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+application = get_wsgi_application()
+get_resolver().url_patterns
+print('\\n'.join(sys.modules))
+"""
+
+# Optional heavy dependencies that must only be imported by the code that uses them.
+HEAVY_MODULES = ['numpy', 'matplotlib', 'pyproj', 'PIL']
+
+
+def measure_boot(settings_module):
+    """Boot Django in a fresh interpreter under ``-X importtime``.
+
+    Returns ``(timings, loaded)``: ``timings`` maps module name to
+    ``(self_us, cumulative_us)`` and ``loaded`` is the set of modules in
+    ``sys.modules`` once the URLconf is loaded.
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+        capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+    )
+    if result.returncode != 0:
+        raise CommandError(f'Boot failed:\n{result.stderr[-2000:]}')
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings, set(result.stdout.split())
+
+
+class Command(BaseCommand):
+    help = 'Report per-module import time for a worker boot, optionally failing above a budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='Number of slowest modules to list')
+        parser.add_argument(
+            '--threshold-ms', type=float, default=None,
+            help='Fail if total import time exceeds this many milliseconds'
+        )
+        parser.add_argument(
+            '--allow-heavy', action='store_true',
+            help=f"Do not fail when {', '.join(HEAVY_MODULES)} are imported at boot"
+        )
+
+    def handle(self, *args, **options):
+        timings, loaded = measure_boot(settings.SETTINGS_MODULE)
+        total_ms = sum(self_us for self_us, _ in timings.values()) / 1000
+
+        # Group by top-level package so e.g. all of django.* is one line.
+        packages = {}
+        for name, (self_us, _) in timings.items():
+            package = name.split('.')[0]
+            packages[package] = packages.get(package, 0) + self_us
+
+        self.stdout.write(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+        slowest = sorted(timings.items(), key=lambda item: -item[1][1])[:options['top']]
+        for name, (self_us, cumulative_us) in slowest:
+            self.stdout.write(f'{cumulative_us / 1000:>14.1f}  {self_us / 1000:>8.1f}  {name}')
+
+        self.stdout.write(f"\n{'total ms':>14}  package")
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'{self_us / 1000:>14.1f}  {package}')
+        self.stdout.write(f'\nTotal import time: {total_ms:.1f} ms across {len(timings)} modules')
+
+        problems = []
+        heavy = [module for module in HEAVY_MODULES if module in loaded]
+        if heavy and not options['allow_heavy']:
+            problems.append(f"heavy modules imported at boot: {', '.join(heavy)}")
+        threshold = options['threshold_ms']
+        if threshold is not None and total_ms > threshold:
+            problems.append(f'total import time {total_ms:.1f} ms exceeds {threshold:.1f} ms')
+        if problems:
+            raise CommandError('; '.join(problems))
+        self.stdout.write(self.style.SUCCESS('Import time within budget'))
@@ -0,0 +1,271 @@
+import json
+import os
+import platform
+import re
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from bridges import loadtest
+
+# Seeds the server's database and prints the scenario data as JSON.
+SEED_SCRIPT = """
+import json, sys
+import django
+django.setup()
+from django.contrib.auth.models import User
+from bridges import loadtest
+from bridges.sampledata import create_sample_network
+count, username, password = int(sys.argv[1]), sys.argv[2], sys.argv[3]
+create_sample_network(count, name_prefix='Load Test Bridge')
+User.objects.create_user(username, password=password)
+print(json.dumps(loadtest.scenario_data()))
+"""
+
+USERNAME = 'loadtest'
+BOOT_TIMEOUT = 60
+# The last line of a traceback, e.g. 'django.db.utils.OperationalError: database is locked'.
+EXCEPTION_LINE_RE = re.compile(r'^[\w.]+(Error|Exception): ')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the site under gunicorn with concurrent users and weighted scenarios, '
+        'reporting throughput, latency percentiles and error rates per URL name'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50, help='Concurrent simulated users')
+        parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+        parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds before that')
+        parser.add_argument(
+            '--mix', type=loadtest.parse_mix, default=loadtest.DEFAULT_MIX,
+            help='Scenario weights, e.g. "bridge_list=30,dashboard=20" (default: %(default)s)'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the scenario choices')
+
+        server = parser.add_argument_group('server started by the command')
+        server.add_argument('--bridges', type=int, default=2000, help='Size of the seeded network')
+        server.add_argument(
+            '--database-url', default=None,
+            help='Empty database to seed and serve from (default: a temporary SQLite file, '
+                 'which can only be served by one single-threaded worker)'
+        )
+        server.add_argument('--workers', type=int, default=None, help='gunicorn workers (default: from gunicorn.conf.py)')
+        server.add_argument('--threads', type=int, default=None, help='Threads per gunicorn worker')
+        server.add_argument('--asgi', action='store_true', help='Serve the ASGI application on uvicorn workers')
+
+        existing = parser.add_argument_group('existing server')
+        existing.add_argument(
+            '--url', default=None,
+            help='Test a server that is already running, e.g. http://127.0.0.1:8000. '
+                 'Scenario data is read from this project\'s database, which must be the one it serves.'
+        )
+        existing.add_argument('--username', default=None)
+        existing.add_argument('--password', default=None)
+
+        baseline = parser.add_argument_group('baseline')
+        baseline.add_argument(
+            '--baseline', default=os.path.join(settings.BASE_DIR, 'loadtest-baseline.json'),
+            help='Baseline file to compare against (default: %(default)s)'
+        )
+        baseline.add_argument('--save-baseline', action='store_true', help='Write this run to the baseline file')
+        baseline.add_argument(
+            '--max-regression', type=float, default=None,
+            help='Fail if any request fails, or any URL name is this many percent slower (p95) '
+                 'or lower in throughput than the baseline'
+        )
+
+    def handle(self, *args, **options):
+        config = {
+            key: options[key] for key in ('clients', 'duration', 'warmup', 'mix', 'bridges', 'workers', 'threads', 'asgi')
+        }
+        if options['url']:
+            if not (options['username'] and options['password']):
+                raise CommandError('--url needs --username and --password')
+            config.update(bridges=None, workers=None, threads=None, asgi=None)
+            base_url, username, password = options['url'].rstrip('/'), options['username'], options['password']
+            data = loadtest.scenario_data()
+            results = self.drive(base_url, username, password, data, options)
+        else:
+            if not options['database_url'] and (options['workers'] or 1) * (options['threads'] or 1) > 1:
+                raise CommandError(
+                    'SQLite allows one writer at a time, so more workers or threads only produce '
+                    '"database is locked" errors; pass --database-url to test them'
+                )
+            password = secrets.token_urlsafe(16)
+            with self.server(options, password) as (base_url, data, log_path):
+                results = self.drive(base_url, USERNAME, password, data, options)
+                if results['TOTAL']['errors']:
+                    self.report_server_errors(log_path)
+        config.update(cpu_count=os.cpu_count(), python=platform.python_version())
+
+        self.report(results)
+        self.check_baseline(results, config, options)
+
+    def drive(self, base_url, username, password, data, options):
+        self.stdout.write(
+            f"Driving {options['clients']} users against {base_url} for "
+            f"{options['warmup']:g}s warm-up + {options['duration']:g}s..."
+        )
+        try:
+            return loadtest.run(
+                base_url, username, password, data,
+                clients=options['clients'], duration=options['duration'], warmup=options['warmup'],
+                mix=options['mix'], seed=options['seed'],
+            )
+        except (loadtest.LoadTestError, OSError) as exc:
+            raise CommandError(str(exc))
+
+    @contextmanager
+    def server(self, options, password):
+        """Migrate, seed and collect static files, then run gunicorn until the block exits."""
+        with tempfile.TemporaryDirectory(prefix='bridges-loadtest-') as tmp:
+            port = free_port()
+            env = dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE='bridge_inventory.settings_production',
+                DJANGO_SECRET_KEY=os.environ.get('DJANGO_SECRET_KEY') or secrets.token_urlsafe(50),
+                DATABASE_URL=options['database_url'] or f'sqlite:///{tmp}/db.sqlite3',
+                DJANGO_CACHE_DIR=os.path.join(tmp, 'cache'),
+                DJANGO_STATIC_ROOT=os.path.join(tmp, 'static'),
+                DJANGO_ALLOWED_HOSTS='127.0.0.1',
+                DJANGO_SECURE_COOKIES='0',
+                DJANGO_LOG_LEVEL='WARNING',
+                GUNICORN_BIND=f'127.0.0.1:{port}',
+                GUNICORN_ACCESS_LOG='',
+                GUNICORN_LOG_LEVEL='warning',
+            )
+            if options['workers']:
+                env['GUNICORN_WORKERS'] = str(options['workers'])
+            if options['threads']:
+                env['GUNICORN_THREADS'] = str(options['threads'])
+            if options['asgi']:
+                env['GUNICORN_ASGI'] = '1'
+
+            self.stdout.write(f"Seeding {options['bridges']} bridges...")
+            manage = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py')]
+            self.run_step(manage + ['migrate', '--noinput'], env)
+            self.run_step(manage + ['collectstatic', '--noinput'], env)
+            seeded = self.run_step(
+                [sys.executable, '-c', SEED_SCRIPT, str(options['bridges']), USERNAME, password], env
+            )
+            data = json.loads(seeded.splitlines()[-1])
+
+            log_path = os.path.join(tmp, 'gunicorn.log')
+            with open(log_path, 'w') as log:
+                process = subprocess.Popen(
+                    [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+                    cwd=settings.BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+                )
+            try:
+                base_url = f'http://127.0.0.1:{port}'
+                self.wait_until_ready(base_url, process, log_path)
+                yield base_url, data, log_path
+            finally:
+                process.terminate()
+                try:
+                    process.wait(30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+
+    def run_step(self, command, env):
+        result = subprocess.run(command, capture_output=True, text=True, env=env, cwd=settings.BASE_DIR)
+        if result.returncode != 0:
+            raise CommandError(f"{' '.join(command[:3])} failed:\n{result.stderr[-2000:]}")
+        return result.stdout
+
+    def wait_until_ready(self, base_url, process, log_path):
+        deadline = time.monotonic() + BOOT_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                break
+            try:
+                with urllib.request.urlopen(base_url + reverse('login'), timeout=5):
+                    return
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.5)
+        with open(log_path) as log:
+            raise CommandError(f'gunicorn did not start:\n{log.read()[-2000:]}')
+
+    def report_server_errors(self, log_path):
+        """Summarise the exceptions in the server log, most frequent first."""
+        with open(log_path) as log:
+            exceptions = Counter(
+                line.strip() for line in log if EXCEPTION_LINE_RE.match(line)
+            )
+        if exceptions:
+            self.stdout.write(self.style.WARNING('\nServer exceptions:'))
+            for line, count in exceptions.most_common(10):
+                self.stdout.write(f'{count:>6}  {line}')
+
+    def report(self, results):
+        self.stdout.write(
+            f"\n{'url name':<28}{'requests':>9}{'req/s':>9}{'errors':>8}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<28}{stats['requests']:>9}{stats['rps']:>9.1f}{stats['error_rate']:>8.1%}"
+                f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+            )
+        for name, stats in results.items():
+            if stats['failures'] and name != 'TOTAL':
+                reasons = ', '.join(f'{reason} x{count}' for reason, count in stats['failures'].items())
+                self.stdout.write(self.style.WARNING(f'{name} failures: {reasons}'))
+
+    def check_baseline(self, results, config, options):
+        path = options['baseline']
+        if options['save_baseline']:
+            if results['TOTAL']['errors']:
+                raise CommandError(
+                    f"Not saving a baseline with {results['TOTAL']['errors']} failed requests; fix them first"
+                )
+            with open(path, 'w') as f:
+                json.dump({'config': config, 'results': results}, f, indent=2)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline saved to {path}'))
+            return
+        if not os.path.exists(path):
+            if options['max_regression'] is not None:
+                raise CommandError(f'No baseline at {path}; run with --save-baseline first')
+            return
+
+        with open(path) as f:
+            baseline = json.load(f)
+        differing = [key for key, value in config.items() if baseline['config'].get(key) != value]
+        if differing:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was recorded with different {', '.join(differing)}; compare with care"
+            ))
+        self.stdout.write(f"\n{'vs baseline':<28}{'req/s':>9}{'p95 ms':>9}")
+        for name, stats in results.items():
+            base = baseline['results'].get(name)
+            if base:
+                rps = (stats['rps'] / base['rps'] - 1) if base['rps'] else 0
+                p95 = (stats['p95_ms'] / base['p95_ms'] - 1) if base['p95_ms'] else 0
+                self.stdout.write(f'{name:<28}{rps:>+9.0%}{p95:>+9.0%}')
+
+        if options['max_regression'] is not None:
+            problems = loadtest.compare(results, baseline['results'], options['max_regression'])
+            if problems:
+                raise CommandError('Regressed against baseline: ' + '; '.join(problems))
+            self.stdout.write(self.style.SUCCESS('Within baseline'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from bridges.routes import normalize_routes
+
+
+class Command(BaseCommand):
+    help = 'Link every bridge to its normalised Route, creating routes as needed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = normalize_routes(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated the route of {updated} bridge(s)'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from bridges import cube
+
+
+class Command(BaseCommand):
+    help = 'Recompute every cell of the condition reporting cube'
+
+    def handle(self, *args, **options):
+        cells = cube.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt condition cube ({cells} cells)'))
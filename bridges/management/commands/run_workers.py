@@ -0,0 +1,103 @@
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from bridges import jobs
+
+
+def _worker_main(index, poll_interval, burst, stop_event):
+    # Connections inherited from the parent must not be shared across processes.
+    connections.close_all()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker_id = f"{jobs.default_worker_id()}/{index}"
+    try:
+        jobs.work(worker_id, poll_interval, burst, should_stop=stop_event.is_set)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers from the database-backed queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=multiprocessing.cpu_count(),
+            help='Number of worker processes (default: CPU count). 1 runs in-process.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds to wait before polling an empty queue again'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once the queue is empty instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        poll_interval = options['poll_interval']
+        burst = options['burst']
+
+        self.requeue_stale()
+
+        if processes == 1:
+            processed = jobs.work(
+                poll_interval=poll_interval, burst=burst, requeue_interval=jobs.STALE_CHECK_INTERVAL
+            )
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} job(s)'))
+            return
+
+        stop_event = multiprocessing.Event()
+
+        def request_stop(signum, frame):
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        # Close the parent's connections before forking so children open their own.
+        connections.close_all()
+        pool = {}
+
+        def start(index):
+            proc = multiprocessing.Process(
+                target=_worker_main,
+                args=(index, poll_interval, burst, stop_event),
+                daemon=True,
+            )
+            proc.start()
+            pool[index] = proc
+
+        for index in range(processes):
+            start(index)
+        self.stdout.write(self.style.SUCCESS(f'Started {processes} worker process(es)'))
+
+        # Supervise: restart crashed workers and recover the jobs they were
+        # running, until asked to stop.
+        next_requeue = time.monotonic() + jobs.STALE_CHECK_INTERVAL
+        while pool:
+            if time.monotonic() >= next_requeue:
+                self.requeue_stale()
+                next_requeue = time.monotonic() + jobs.STALE_CHECK_INTERVAL
+            for index, proc in list(pool.items()):
+                proc.join(timeout=1.0)
+                if proc.is_alive():
+                    continue
+                del pool[index]
+                if proc.exitcode != 0 and not stop_event.is_set() and not burst:
+                    self.stdout.write(self.style.WARNING(
+                        f'Worker {index} exited with code {proc.exitcode}; restarting'
+                    ))
+                    start(index)
+
+        self.stdout.write(self.style.SUCCESS('All workers stopped'))
+
+    def requeue_stale(self):
+        requeued, failed = jobs.requeue_stale()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale job(s)'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'Failed {failed} stale job(s) with no attempts left'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from bridges.screening import run_screening
+
+
+class Command(BaseCommand):
+    help = 'Screen every bridge for heavy-vehicle overload and store the results'
+
+    def handle(self, *args, **options):
+        summary = run_screening()
+        self.stdout.write(self.style.SUCCESS(
+            f"Screened {summary['bridges']} bridge(s) in {summary['seconds']:.3f}s; "
+            f"{summary['over_threshold']} over threshold"
+        ))
@@ -0,0 +1,29 @@
+"""
+Response compression.
+
+``GZipMiddleware`` compresses every response over 200 bytes, including JPEG
+photos (no gain, only CPU) and 206 partial content (which would no longer
+match its Content-Range), and would buffer Server-Sent Events until enough
+had accumulated to compress. This subclass leaves those alone.
+"""
+from django.middleware.gzip import GZipMiddleware
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson',
+    'image/svg+xml',
+)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if (
+            response.status_code == 206
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+            or content_type.startswith('text/event-stream')
+        ):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,52 @@
+# Generated by Django 5.0 on 2026-10-18 23:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridges', '0002_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(max_length=255, upload_to='')),
+                ('content_type', models.CharField(max_length=100)),
+                ('size', models.PositiveBigIntegerField(help_text='Size in bytes')),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('thumbnails_ready', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Photo Blob',
+                'verbose_name_plural': 'Photo Blobs',
+            },
+        ),
+        migrations.CreateModel(
+            name='PhotoAttachment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('caption', models.CharField(blank=True, max_length=200)),
+                ('original_filename', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('bridge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='photos', to='bridges.bridge')),
+                ('maintenance_record', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='photos', to='bridges.maintenancerecord')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='bridges.photoblob')),
+            ],
+            options={
+                'verbose_name': 'Photo Attachment',
+                'verbose_name_plural': 'Photo Attachments',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0 on 2026-10-18 23:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_change_log(apps, schema_editor):
+    """Log every existing row so a first sync from zero returns the full data set."""
+    SyncChange = apps.get_model('bridges', 'SyncChange')
+    for model_name in ('bridge', 'trafficdata', 'maintenancerecord'):
+        Model = apps.get_model('bridges', model_name)
+        SyncChange.objects.bulk_create(
+            [SyncChange(model=model_name, object_id=pk) for pk in Model.objects.values_list('pk', flat=True)],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridges', '0003_photo_attachments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Sync Change',
+                'verbose_name_plural': 'Sync Changes',
+                'ordering': ['seq'],
+            },
+        ),
+        migrations.AddField(
+            model_name='maintenancerecord',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='trafficdata',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddConstraint(
+            model_name='syncchange',
+            constraint=models.UniqueConstraint(fields=('model', 'object_id'), name='sync_change_object_uniq'),
+        ),
+        migrations.RunPython(seed_change_log, migrations.RunPython.noop),
+    ]
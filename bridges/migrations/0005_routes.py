@@ -0,0 +1,85 @@
+# Generated by Django 5.0 on 2026-10-18 23:53
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# A frozen copy of bridges.routes.normalize_route_name: migrations must not
+# import live app code, which may change or import models that differ from
+# the historical ones.
+QUALIFIER_RE = re.compile(r'\s+(?:WITH|AT|OVER|UNDER|NEAR)\s.*$')
+PARENTHETICAL_RE = re.compile(r'\([^)]*\)')
+HYPHEN_RE = re.compile(r'\s*-\s*')
+PUNCTUATION_RE = re.compile(r'[^\w\s\-/]')
+WHITESPACE_RE = re.compile(r'\s+')
+SUFFIX_ABBREVIATIONS = {
+    'RD': 'ROAD',
+    'ST': 'STREET',
+    'AVE': 'AVENUE',
+    'HWY': 'HIGHWAY',
+    'DR': 'DRIVE',
+}
+
+
+def normalize_route_name(text):
+    name = (text or '').upper()
+    name = PARENTHETICAL_RE.sub(' ', name)
+    name = PUNCTUATION_RE.sub(' ', name)
+    name = HYPHEN_RE.sub('-', name)
+    name = WHITESPACE_RE.sub(' ', name).strip()
+    name = QUALIFIER_RE.sub('', name)
+    words = name.split(' ')
+    words[-1] = SUFFIX_ABBREVIATIONS.get(words[-1], words[-1])
+    return ' '.join(words).strip('-/ ')[:200]
+
+
+def populate_routes(apps, schema_editor):
+    Bridge = apps.get_model('bridges', 'Bridge')
+    Route = apps.get_model('bridges', 'Route')
+    SyncChange = apps.get_model('bridges', 'SyncChange')
+
+    routes = {}
+    bridges = list(Bridge.objects.only('pk', 'route'))
+    for bridge in bridges:
+        name = normalize_route_name(bridge.route)
+        if name and name not in routes:
+            routes[name], _ = Route.objects.get_or_create(name=name)
+        bridge.normalized_route = routes.get(name)
+    Bridge.objects.bulk_update(bridges, ['normalized_route'], batch_size=500)
+
+    # Re-log every bridge so synced tablets receive the new column.
+    SyncChange.objects.filter(model='bridge').delete()
+    SyncChange.objects.bulk_create(
+        [SyncChange(model='bridge', object_id=bridge.pk) for bridge in bridges],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridges', '0004_sync_changes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Route',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Route',
+                'verbose_name_plural': 'Routes',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='bridge',
+            name='normalized_route',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bridges', to='bridges.route'),
+        ),
+        migrations.RunPython(populate_routes, migrations.RunPython.noop),
+    ]
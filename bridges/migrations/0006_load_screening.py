@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-18 23:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridges', '0005_routes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadScreening',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('heavy_share', models.FloatField(help_text='Heavy vehicles as a fraction of all traffic')),
+                ('heavy_per_lane', models.FloatField(help_text='Daily heavy vehicles per lane')),
+                ('vehicles_per_lane', models.FloatField(help_text='Daily vehicles per lane')),
+                ('demand', models.FloatField(help_text='Relative heavy-vehicle demand on the structure')),
+                ('capacity', models.FloatField(help_text='Relative capacity from type, material and condition')),
+                ('load_index', models.FloatField(db_index=True, help_text='Demand over capacity; above 1 needs review')),
+                ('screened_at', models.DateTimeField()),
+                ('bridge', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='screening', to='bridges.bridge')),
+            ],
+            options={
+                'verbose_name': 'Load Screening',
+                'verbose_name_plural': 'Load Screenings',
+                'ordering': ['-load_index'],
+            },
+        ),
+    ]
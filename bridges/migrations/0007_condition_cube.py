@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-18 23:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridges', '0006_load_screening'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConditionCubeCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bridge_type', models.CharField(choices=[('BEAM_COMPOSITE', 'Beam Composite Bridge'), ('SUSPENSION', 'Suspension Bridge'), ('ARCH', 'Arch Bridge'), ('TRUSS', 'Truss Bridge')], max_length=50)),
+                ('material', models.CharField(choices=[('STEEL_CONCRETE', 'Steel and Concrete'), ('CONCRETE', 'Concrete'), ('STEEL', 'Steel')], max_length=50)),
+                ('decade', models.PositiveIntegerField(help_text='Decade of year_built, e.g. 1990')),
+                ('lanes', models.PositiveIntegerField()),
+                ('bridge_count', models.PositiveIntegerField(default=0)),
+                ('rated_count', models.PositiveIntegerField(default=0, help_text='Bridges with at least one rating')),
+                ('rating_sum', models.FloatField(default=0)),
+                ('excellent_count', models.PositiveIntegerField(default=0)),
+                ('very_good_count', models.PositiveIntegerField(default=0)),
+                ('good_count', models.PositiveIntegerField(default=0)),
+                ('fair_count', models.PositiveIntegerField(default=0)),
+                ('poor_count', models.PositiveIntegerField(default=0)),
+                ('heavy_vehicles', models.PositiveBigIntegerField(default=0)),
+                ('small_vehicles', models.PositiveBigIntegerField(default=0)),
+                ('traffic_count', models.PositiveIntegerField(default=0, help_text='Bridges with traffic data')),
+                ('maintenance_count', models.PositiveIntegerField(default=0)),
+                ('maintenance_cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Condition Cube Cell',
+                'verbose_name_plural': 'Condition Cube Cells',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='conditioncubecell',
+            constraint=models.UniqueConstraint(fields=('bridge_type', 'material', 'decade', 'lanes'), name='condition_cube_cell_uniq'),
+        ),
+    ]
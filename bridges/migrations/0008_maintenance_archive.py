@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-19 00:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridges', '0007_condition_cube'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMaintenanceRecord',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('action_type', models.CharField(choices=[('MINOR_REPAIR', 'Minor Repairs'), ('ROUTINE', 'Routine Maintenance'), ('MONITORING', 'Normal Monitoring'), ('MAJOR_REPAIR', 'Major Repairs'), ('INSPECTION', 'Inspection')], max_length=50)),
+                ('description', models.TextField()),
+                ('scheduled_date', models.DateField()),
+                ('completed_date', models.DateField(blank=True, null=True)),
+                ('cost', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('is_completed', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Maintenance Record',
+                'verbose_name_plural': 'Archived Maintenance Records',
+                'ordering': ['-scheduled_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MaintenanceArchiveSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_count', models.PositiveIntegerField(default=0)),
+                ('total_cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('last_completed_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Maintenance Archive Summary',
+                'verbose_name_plural': 'Maintenance Archive Summaries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerecord',
+            index=models.Index(fields=['is_completed', 'completed_date'], name='maint_archive_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedmaintenancerecord',
+            name='bridge',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_maintenance_records', to='bridges.bridge'),
+        ),
+        migrations.AddField(
+            model_name='maintenancearchivesummary',
+            name='bridge',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='maintenance_archive', to='bridges.bridge'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-19 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bridges', '0008_maintenance_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConditionCubeBuild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('built_at', models.DateTimeField()),
+                ('cell_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Condition Cube Build',
+                'verbose_name_plural': 'Condition Cube Builds',
+            },
+        ),
+    ]
@@ -1,5 +1,21 @@
+from django.conf import settings
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+
+class Route(models.Model):
+    """A road corridor; the normalised form of ``Bridge.route`` (see ``bridges/routes.py``)."""
+    name = models.CharField(max_length=200, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Route'
+        verbose_name_plural = 'Routes'
+
+    def __str__(self):
+        return self.name
+
 
 class Bridge(models.Model):
     BRIDGE_TYPES = [
@@ -31,6 +47,10 @@ class Bridge(models.Model):
     material = models.CharField(max_length=50, choices=MATERIAL_CHOICES)
     year_built = models.PositiveIntegerField()
     route = models.TextField(help_text="Route description")
+    normalized_route = models.ForeignKey(
+        Route, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='bridges', editable=False
+    )
     gps_coordinates = models.TextField(help_text="GPS coordinates (comma-separated)")
     
     # Condition ratings (1-5 scale)
@@ -64,6 +84,15 @@ class Bridge(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'route' in update_fields:
+            from .routes import route_for_text
+            self.normalized_route = route_for_text(self.route)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'normalized_route'}
+        super().save(*args, **kwargs)
+
     @property
     def average_rating(self):
         ratings = [r for r in [self.deck_rating, self.girders_rating, 
@@ -97,6 +126,7 @@ class TrafficData(models.Model):
     heavy_vehicles = models.PositiveIntegerField(default=0, help_text="Daily count")
     small_vehicles = models.PositiveIntegerField(default=0, help_text="Daily count")
     recorded_date = models.DateField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Traffic Data'
@@ -127,11 +157,283 @@ class MaintenanceRecord(models.Model):
     cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-scheduled_date']
         verbose_name = 'Maintenance Record'
         verbose_name_plural = 'Maintenance Records'
+        indexes = [
+            # Finding records old enough to archive (bridges/archive.py)
+            models.Index(fields=['is_completed', 'completed_date'], name='maint_archive_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.bridge.name} - {self.action_type} ({self.scheduled_date})"
+
+
+class ArchivedMaintenanceRecord(models.Model):
+    """A completed ``MaintenanceRecord`` moved out of the hot table by ``bridges/archive.py``.
+
+    Keeps the original primary key and timestamps so full-history queries can
+    union both tables.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    bridge = models.ForeignKey(Bridge, on_delete=models.CASCADE, related_name='archived_maintenance_records')
+    action_type = models.CharField(max_length=50, choices=MaintenanceRecord.ACTION_TYPES)
+    description = models.TextField()
+    scheduled_date = models.DateField()
+    completed_date = models.DateField(null=True, blank=True)
+    cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    is_completed = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-scheduled_date']
+        verbose_name = 'Archived Maintenance Record'
+        verbose_name_plural = 'Archived Maintenance Records'
+
+    def __str__(self):
+        return f"{self.bridge.name} - {self.action_type} ({self.scheduled_date}, archived)"
+
+
+class MaintenanceArchiveSummary(models.Model):
+    """Running totals of a bridge's archived maintenance records.
+
+    Counts and costs that used to come from the full ``MaintenanceRecord``
+    table add these in, so archiving never changes a total.
+    """
+    bridge = models.OneToOneField(Bridge, on_delete=models.CASCADE, related_name='maintenance_archive')
+    record_count = models.PositiveIntegerField(default=0)
+    total_cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    last_completed_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Maintenance Archive Summary'
+        verbose_name_plural = 'Maintenance Archive Summaries'
+
+    def __str__(self):
+        return f"{self.bridge.name}: {self.record_count} archived record(s)"
+
+
+class LoadScreening(models.Model):
+    """Latest traffic loading screen for a bridge, written by ``bridges/screening.py``."""
+    bridge = models.OneToOneField(Bridge, on_delete=models.CASCADE, related_name='screening')
+    heavy_share = models.FloatField(help_text="Heavy vehicles as a fraction of all traffic")
+    heavy_per_lane = models.FloatField(help_text="Daily heavy vehicles per lane")
+    vehicles_per_lane = models.FloatField(help_text="Daily vehicles per lane")
+    demand = models.FloatField(help_text="Relative heavy-vehicle demand on the structure")
+    capacity = models.FloatField(help_text="Relative capacity from type, material and condition")
+    load_index = models.FloatField(db_index=True, help_text="Demand over capacity; above 1 needs review")
+    screened_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-load_index']
+        verbose_name = 'Load Screening'
+        verbose_name_plural = 'Load Screenings'
+
+    def __str__(self):
+        return f"{self.bridge.name}: {self.load_index:.2f}"
+
+
+class ConditionCubeCell(models.Model):
+    """Pre-aggregated measures for one combination of reporting dimensions.
+
+    Maintained by ``bridges/cube.py``; averages are derived from the sums so
+    cells can be rolled up to any coarser drill-down level.
+    """
+    bridge_type = models.CharField(max_length=50, choices=Bridge.BRIDGE_TYPES)
+    material = models.CharField(max_length=50, choices=Bridge.MATERIAL_CHOICES)
+    decade = models.PositiveIntegerField(help_text="Decade of year_built, e.g. 1990")
+    lanes = models.PositiveIntegerField()
+
+    bridge_count = models.PositiveIntegerField(default=0)
+    rated_count = models.PositiveIntegerField(default=0, help_text="Bridges with at least one rating")
+    rating_sum = models.FloatField(default=0)
+    excellent_count = models.PositiveIntegerField(default=0)
+    very_good_count = models.PositiveIntegerField(default=0)
+    good_count = models.PositiveIntegerField(default=0)
+    fair_count = models.PositiveIntegerField(default=0)
+    poor_count = models.PositiveIntegerField(default=0)
+    heavy_vehicles = models.PositiveBigIntegerField(default=0)
+    small_vehicles = models.PositiveBigIntegerField(default=0)
+    traffic_count = models.PositiveIntegerField(default=0, help_text="Bridges with traffic data")
+    maintenance_count = models.PositiveIntegerField(default=0)
+    maintenance_cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['bridge_type', 'material', 'decade', 'lanes'], name='condition_cube_cell_uniq'
+            ),
+        ]
+        verbose_name = 'Condition Cube Cell'
+        verbose_name_plural = 'Condition Cube Cells'
+
+    def __str__(self):
+        return f"{self.bridge_type}/{self.material}/{self.decade}s/{self.lanes} lanes"
+
+
+class ConditionCubeBuild(models.Model):
+    """The last full build of the condition cube (a single row).
+
+    Cells written by incremental refreshes alone do not make a complete
+    cube; ``bridges/cube.py`` only trusts the cells once this row exists.
+    """
+    built_at = models.DateTimeField()
+    cell_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Condition Cube Build'
+        verbose_name_plural = 'Condition Cube Builds'
+
+    def __str__(self):
+        return f"{self.cell_count} cells built {self.built_at:%Y-%m-%d %H:%M}"
+
+
+class SyncChange(models.Model):
+    """Change log behind the offline sync API (``bridges/sync.py``).
+
+    Each synced object has exactly one row; every save or delete gives it a
+    new ``seq``, so ``seq`` only ever grows and the table stays the size of
+    the data set. Rows with ``deleted=True`` are the tombstones.
+    """
+    seq = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['seq']
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'object_id'], name='sync_change_object_uniq'),
+        ]
+        verbose_name = 'Sync Change'
+        verbose_name_plural = 'Sync Changes'
+
+    def __str__(self):
+        action = 'deleted' if self.deleted else 'changed'
+        return f"#{self.seq} {self.model} {self.object_id} {action}"
+
+
+class PhotoBlob(models.Model):
+    """Image content stored once under its SHA-256, however often it is uploaded.
+
+    Thumbnails are generated by a background job; see ``bridges/photos.py``.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField(help_text="Size in bytes")
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    thumbnails_ready = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Photo Blob'
+        verbose_name_plural = 'Photo Blobs'
+
+    def __str__(self):
+        return self.sha256
+
+
+class PhotoAttachment(models.Model):
+    bridge = models.ForeignKey(Bridge, on_delete=models.CASCADE, related_name='photos')
+    maintenance_record = models.ForeignKey(
+        MaintenanceRecord, on_delete=models.CASCADE,
+        related_name='photos', null=True, blank=True
+    )
+    blob = models.ForeignKey(PhotoBlob, on_delete=models.PROTECT, related_name='attachments')
+    caption = models.CharField(max_length=200, blank=True)
+    original_filename = models.CharField(max_length=255, blank=True)
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Photo Attachment'
+        verbose_name_plural = 'Photo Attachments'
+
+    def __str__(self):
+        return self.caption or self.original_filename or f"Photo of {self.bridge.name}"
+
+class Job(models.Model):
+    """A unit of background work stored in the application database.
+
+    Rows are claimed by ``run_workers`` processes; see ``bridges/jobs.py``.
+    """
+    STATUS_QUEUED = 'QUEUED'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_SUCCEEDED = 'SUCCEEDED'
+    STATUS_FAILED = 'FAILED'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100, help_text="Registered task name")
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    priority = models.IntegerField(default=0, help_text="Higher runs first")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    progress = models.PositiveSmallIntegerField(
+        default=0,
+        validators=[MaxValueValidator(100)],
+        help_text="Percent complete"
+    )
+    progress_message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_after'], name='job_claim_idx'),
+        ]
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
 
     def __str__(self):
-        return f"{self.bridge.name} - {self.action_type} ({self.scheduled_date})"
\ No newline at end of file
+        return f"{self.task} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    def set_progress(self, percent, message=''):
+        """Record progress with a single UPDATE so pollers see it immediately.
+
+        This is also the worker's heartbeat: it refreshes ``locked_at``, so
+        a job that reports progress is not taken for one abandoned by a dead
+        worker (see ``bridges.jobs.STALE_AFTER``).
+        """
+        now = timezone.now()
+        self.progress = max(0, min(100, int(percent)))
+        self.progress_message = message[:255]
+        self.locked_at = now
+        Job.objects.filter(pk=self.pk, status=self.STATUS_RUNNING, locked_by=self.locked_by).update(
+            progress=self.progress,
+            progress_message=self.progress_message,
+            locked_at=now,
+            updated_at=now,
+        )
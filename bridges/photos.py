@@ -0,0 +1,115 @@
+"""
+Content-addressed storage and thumbnailing for inspection photos.
+
+Uploads are hashed while streaming; identical content maps to one ``PhotoBlob``
+and one file on disk. Thumbnails are rendered by the ``photos.thumbnails``
+background job (or ``manage.py generate_thumbnails`` for backfills), never in
+the request that uploaded the photo.
+"""
+import hashlib
+import mimetypes
+from io import BytesIO
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .jobs import enqueue
+from .models import PhotoBlob
+
+# Longest edge in pixels for each thumbnail size, largest first.
+THUMBNAIL_SIZES = {
+    'lg': 1280,
+    'md': 480,
+    'sm': 160,
+}
+THUMBNAIL_QUALITY = 82
+
+
+def original_name(sha256, extension):
+    return f"photos/{sha256[:2]}/{sha256}{extension}"
+
+
+def thumbnail_name(sha256, size):
+    return f"photos/thumbs/{size}/{sha256[:2]}/{sha256}.jpg"
+
+
+def hash_upload(uploaded_file):
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_upload(uploaded_file):
+    """Return ``(blob, created)`` for an uploaded image, storing it only once.
+
+    ``uploaded_file`` is expected to come from a ``forms.ImageField``, which has
+    already verified it with Pillow and set ``content_type`` and ``image``.
+    """
+    sha256 = hash_upload(uploaded_file)
+    blob = PhotoBlob.objects.filter(sha256=sha256).first()
+    if blob is not None:
+        return blob, False
+
+    content_type = getattr(uploaded_file, 'content_type', None) or 'application/octet-stream'
+    extension = (
+        mimetypes.guess_extension(content_type)
+        or Path(uploaded_file.name).suffix.lower()
+        or ''
+    )
+    name = original_name(sha256, extension)
+    if not default_storage.exists(name):
+        uploaded_file.seek(0)
+        name = default_storage.save(name, uploaded_file)
+
+    image = getattr(uploaded_file, 'image', None)
+    width, height = image.size if image is not None else (None, None)
+
+    blob, created = PhotoBlob.objects.get_or_create(
+        sha256=sha256,
+        defaults={
+            'file': name,
+            'content_type': content_type,
+            'size': uploaded_file.size,
+            'width': width,
+            'height': height,
+        },
+    )
+    if created:
+        enqueue('photos.thumbnails', priority=5, blob_id=blob.pk)
+    return blob, created
+
+
+def generate_thumbnails(blob):
+    """Render every size in ``THUMBNAIL_SIZES`` for ``blob`` and mark it ready."""
+    from PIL import Image, ImageOps
+
+    largest = max(THUMBNAIL_SIZES.values())
+    with default_storage.open(blob.file.name, 'rb') as fh, Image.open(fh) as image:
+        # Let the JPEG decoder downscale while decoding; far cheaper than a
+        # full-resolution decode for multi-megapixel camera images.
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        # Each size is resized from the previous (larger) one.
+        for size, edge in sorted(THUMBNAIL_SIZES.items(), key=lambda item: -item[1]):
+            image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            image.save(buffer, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+            name = thumbnail_name(blob.sha256, size)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    PhotoBlob.objects.filter(pk=blob.pk).update(thumbnails_ready=True)
+    blob.thumbnails_ready = True
+    return blob
+
+
+def generate_thumbnails_for_id(blob_id):
+    """Process-pool entry point; only the primary key crosses the process boundary."""
+    generate_thumbnails(PhotoBlob.objects.get(pk=blob_id))
+    return blob_id
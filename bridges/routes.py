@@ -0,0 +1,86 @@
+"""
+Normalisation of free-text ``Bridge.route`` descriptions into ``Route`` rows.
+
+"CITY-MASVINGO ROAD WITH AN UNDERPASS" and "City - Masvingo Rd" both belong to
+the CITY-MASVINGO ROAD corridor, so grouping and filtering go through the
+indexed ``Bridge.normalized_route`` foreign key instead of text scans.
+"""
+import re
+
+from . import analytics, sync
+from .models import Bridge, Route
+
+# Trailing descriptions of the crossing rather than the road itself.
+QUALIFIER_RE = re.compile(r'\s+(?:WITH|AT|OVER|UNDER|NEAR)\s.*$')
+PARENTHETICAL_RE = re.compile(r'\([^)]*\)')
+HYPHEN_RE = re.compile(r'\s*-\s*')
+PUNCTUATION_RE = re.compile(r'[^\w\s\-/]')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Expanded in the last word only: "ST MARYS RD" is ST MARYS ROAD, not
+# STREET MARYS ROAD.
+SUFFIX_ABBREVIATIONS = {
+    'RD': 'ROAD',
+    'ST': 'STREET',
+    'AVE': 'AVENUE',
+    'HWY': 'HIGHWAY',
+    'DR': 'DRIVE',
+}
+
+
+def normalize_route_name(text):
+    """Return the corridor key for a route description, or '' if there is none."""
+    name = (text or '').upper()
+    name = PARENTHETICAL_RE.sub(' ', name)
+    name = PUNCTUATION_RE.sub(' ', name)
+    name = HYPHEN_RE.sub('-', name)
+    name = WHITESPACE_RE.sub(' ', name).strip()
+    name = QUALIFIER_RE.sub('', name)
+    words = name.split(' ')
+    words[-1] = SUFFIX_ABBREVIATIONS.get(words[-1], words[-1])
+    return ' '.join(words).strip('-/ ')[:200]
+
+
+def route_for_text(text):
+    name = normalize_route_name(text)
+    if not name:
+        return None
+    route, _ = Route.objects.get_or_create(name=name)
+    return route
+
+
+def normalize_routes(batch_size=500):
+    """Assign ``normalized_route`` for every bridge, in primary-key batches.
+
+    Returns the number of bridges whose route changed.
+    """
+    updated = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Bridge.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .only('pk', 'route', 'normalized_route')[:batch_size]
+        )
+        if not batch:
+            if updated:
+                analytics.invalidate()
+            return updated
+        last_pk = batch[-1].pk
+
+        names = {bridge.pk: normalize_route_name(bridge.route) for bridge in batch}
+        wanted = {name for name in names.values() if name}
+        Route.objects.bulk_create([Route(name=name) for name in wanted], ignore_conflicts=True)
+        route_ids = dict(Route.objects.filter(name__in=wanted).values_list('name', 'pk'))
+
+        changed = []
+        for bridge in batch:
+            route_id = route_ids.get(names[bridge.pk])
+            if bridge.normalized_route_id != route_id:
+                bridge.normalized_route_id = route_id
+                changed.append(bridge)
+        if changed:
+            Bridge.objects.bulk_update(changed, ['normalized_route'])
+            # bulk_update bypasses signals, so tell the sync log directly.
+            sync.log_changes(Bridge, [bridge.pk for bridge in changed])
+            updated += len(changed)
@@ -0,0 +1,85 @@
+"""
+Synthetic bridge network for benchmarks and load tests.
+
+Rows are inserted with ``bulk_create`` (so model signals do not fire) and then
+registered with the sync change log and condition cube explicitly.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from . import analytics, cube, sync
+from .models import Bridge, TrafficData, MaintenanceRecord
+from .routes import route_for_text
+
+ROUTES = [
+    'CITY-MASVINGO ROAD',
+    'CITY-MASVINGO ROAD WITH AN UNDERPASS',
+    'GLEN NORAH-CHITUNGWIZA',
+    'HARARE-MUTARE ROAD',
+    'HARARE-BULAWAYO ROAD',
+    'SEKE ROAD',
+]
+
+
+def create_sample_network(count, maintenance_per_bridge=4, seed=0, name_prefix='Sample Bridge'):
+    """Create ``count`` bridges with traffic data and maintenance history."""
+    rng = random.Random(seed)
+    bridge_types = [choice for choice, _ in Bridge.BRIDGE_TYPES]
+    materials = [choice for choice, _ in Bridge.MATERIAL_CHOICES]
+    actions = [choice for choice, _ in MaintenanceRecord.ACTION_TYPES]
+    routes = {text: route_for_text(text) for text in ROUTES}
+
+    bridges = []
+    for i in range(count):
+        route = rng.choice(ROUTES)
+        bridges.append(Bridge(
+            name=f'{name_prefix} {i + 1}',
+            bridge_type=rng.choice(bridge_types),
+            length=Decimal(rng.randint(15000, 250000)) / 1000,
+            width=Decimal(rng.randint(700, 2500)) / 100,
+            lanes=rng.randint(1, 6),
+            material=rng.choice(materials),
+            year_built=rng.randint(1950, 2024),
+            route=route,
+            normalized_route=routes[route],
+            gps_coordinates=f'X={rng.uniform(-3000, 0):.3f} Y={rng.uniform(-1990000, -1970000):.3f}',
+            deck_rating=rng.randint(1, 5),
+            girders_rating=rng.randint(1, 5),
+            piers_rating=rng.randint(1, 5),
+            abutment_rating=rng.randint(1, 5),
+        ))
+    bridges = Bridge.objects.bulk_create(bridges, batch_size=500)
+
+    traffic = TrafficData.objects.bulk_create([
+        TrafficData(
+            bridge=bridge,
+            heavy_vehicles=rng.randint(0, 3000),
+            small_vehicles=rng.randint(100, 20000),
+        )
+        for bridge in bridges
+    ], batch_size=500)
+
+    today = date.today()
+    records = []
+    for bridge in bridges:
+        for _ in range(maintenance_per_bridge):
+            scheduled = today - timedelta(days=rng.randint(-60, 1500))
+            completed = scheduled <= today and rng.random() < 0.7
+            records.append(MaintenanceRecord(
+                bridge=bridge,
+                action_type=rng.choice(actions),
+                description='Synthetic maintenance record',
+                scheduled_date=scheduled,
+                completed_date=scheduled + timedelta(days=rng.randint(0, 30)) if completed else None,
+                cost=Decimal(rng.randint(500, 500000)) if completed else None,
+                is_completed=completed,
+            ))
+    records = MaintenanceRecord.objects.bulk_create(records, batch_size=500)
+
+    sync.log_changes(Bridge, [b.pk for b in bridges])
+    sync.log_changes(TrafficData, [t.pk for t in traffic])
+    sync.log_changes(MaintenanceRecord, [r.pk for r in records])
+    cube.rebuild()
+    analytics.invalidate()
+    return bridges
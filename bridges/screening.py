@@ -0,0 +1,206 @@
+"""
+Vectorised traffic loading and overload screening.
+
+The whole network is pulled into NumPy arrays with one query and screened in
+a single pass; results are written to ``LoadScreening`` so the
+"bridges over threshold" endpoint is a plain indexed query. The endpoint
+never screens inside a request: when the results are missing or older than
+the inventory, ``ensure_current()`` queues the ``screening.run`` job.
+
+This is a screening tool to rank bridges for engineering review, not a
+structural assessment. The model is deliberately simple:
+
+    demand    = heavy vehicles per lane / REFERENCE_HEAVY_PER_LANE
+                * span factor * lane-width factor
+    condition = CONDITION_FLOOR + (1 - CONDITION_FLOOR) * (weakest rating - 1) / 4
+    capacity  = bridge type factor * material factor * condition
+    index     = demand / capacity
+
+An index of 1 is nominal loading on a bridge in good condition.
+``DEFAULT_THRESHOLD`` is a review budget rather than a structural limit.
+Pick it so the over-threshold list is about as long as the engineers can
+review, e.g. the 90th percentile of ``LoadScreening.load_index`` on
+current data. Rescale ``REFERENCE_HEAVY_PER_LANE`` only if the traffic
+counts change basis, for example from daily to peak-hour counts. With the
+defaults, about 9% of ``create_sample_network()`` is over the threshold.
+The condition floor keeps the ranking from being decided by the weakest
+rating alone.
+"""
+import time
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import Bridge, Job, LoadScreening, TrafficData
+
+# Daily heavy vehicles per lane treated as nominal loading.
+REFERENCE_HEAVY_PER_LANE = 2500.0
+# Spans shorter than this see proportionally fewer heavy vehicles at once.
+REFERENCE_SPAN = 30.0
+# Lane width below which loads concentrate on fewer girders.
+REFERENCE_LANE_WIDTH = 3.5
+# Condition factor for a weakest component rating of 1; a rating of 5 is 1.0.
+CONDITION_FLOOR = 0.5
+# Weakest rating assumed for a bridge with no component ratings (between Fair and Good).
+UNRATED_RATING = 2.5
+
+DEFAULT_THRESHOLD = 1.5
+
+TYPE_CAPACITY = {
+    'BEAM_COMPOSITE': 1.0,
+    'SUSPENSION': 1.2,
+    'ARCH': 1.1,
+    'TRUSS': 0.9,
+}
+MATERIAL_CAPACITY = {
+    'STEEL_CONCRETE': 1.0,
+    'CONCRETE': 0.9,
+    'STEEL': 0.95,
+}
+
+FIELDS = [
+    'pk', 'heavy', 'small', 'lanes', 'width', 'length', 'bridge_type', 'material',
+    'deck_rating', 'girders_rating', 'piers_rating', 'abutment_rating',
+]
+
+
+def _lookup(values, table, default=1.0):
+    """Map an array of choice keys to factors without a per-bridge Python loop."""
+    keys, inverse = np.unique(values, return_inverse=True)
+    factors = np.array([table.get(key, default) for key in keys], dtype=float)
+    return factors[inverse]
+
+
+def load_network():
+    """Return the screening inputs for every bridge as a dict of arrays."""
+    rows = list(
+        Bridge.objects.order_by('pk')
+        .annotate(heavy=Coalesce('traffic__heavy_vehicles', 0), small=Coalesce('traffic__small_vehicles', 0))
+        .values_list(*FIELDS)
+    )
+    if not rows:
+        return None
+    columns = list(zip(*rows))
+    data = dict(zip(FIELDS, columns))
+    network = {
+        'pk': np.array(data['pk'], dtype=np.int64),
+        'bridge_type': np.array(data['bridge_type'], dtype=str),
+        'material': np.array(data['material'], dtype=str),
+        # None (no rating) becomes NaN.
+        'ratings': np.array(
+            [data['deck_rating'], data['girders_rating'], data['piers_rating'], data['abutment_rating']],
+            dtype=float,
+        ),
+    }
+    for field in ('heavy', 'small', 'lanes', 'width', 'length'):
+        network[field] = np.array(data[field], dtype=float)
+    return network
+
+
+def screen(network):
+    """Compute the screening measures for ``network`` in one vectorised pass."""
+    heavy = network['heavy']
+    total = heavy + network['small']
+    lanes = np.maximum(network['lanes'], 1.0)
+
+    heavy_share = np.divide(heavy, total, out=np.zeros_like(heavy), where=total > 0)
+    heavy_per_lane = heavy / lanes
+    vehicles_per_lane = total / lanes
+
+    span_factor = np.sqrt(np.clip(network['length'] / REFERENCE_SPAN, 0.5, 4.0))
+    lane_width = network['width'] / lanes
+    width_factor = np.clip(
+        np.divide(REFERENCE_LANE_WIDTH, lane_width, out=np.ones_like(lane_width), where=lane_width > 0),
+        0.75, 1.5,
+    )
+    demand = heavy_per_lane / REFERENCE_HEAVY_PER_LANE * span_factor * width_factor
+
+    ratings = network['ratings']
+    rated = ~np.isnan(ratings).all(axis=0)
+    weakest = np.where(rated, np.min(np.where(np.isnan(ratings), np.inf, ratings), axis=0), UNRATED_RATING)
+    condition = CONDITION_FLOOR + (1 - CONDITION_FLOOR) * (weakest - 1) / 4
+    capacity = (
+        _lookup(network['bridge_type'], TYPE_CAPACITY)
+        * _lookup(network['material'], MATERIAL_CAPACITY)
+        * condition
+    )
+
+    return {
+        'heavy_share': heavy_share,
+        'heavy_per_lane': heavy_per_lane,
+        'vehicles_per_lane': vehicles_per_lane,
+        'demand': demand,
+        'capacity': capacity,
+        'load_index': demand / capacity,
+    }
+
+
+def store(pks, results, screened_at=None):
+    """Upsert one ``LoadScreening`` row per bridge.
+
+    Written with a single ``executemany`` rather than ``bulk_create``: per-field
+    ORM preparation of ~10 values per bridge costs more than the screening.
+    """
+    measures = list(results)
+    quote = connection.ops.quote_name
+    columns = ['bridge_id', *measures, 'screened_at']
+    screened_at = connection.ops.adapt_datetimefield_value(screened_at or timezone.now())
+    sql = 'INSERT INTO {table} ({columns}) VALUES ({params}) ON CONFLICT ({key}) DO UPDATE SET {updates}'.format(
+        table=quote(LoadScreening._meta.db_table),
+        columns=', '.join(quote(column) for column in columns),
+        params=', '.join(['%s'] * len(columns)),
+        key=quote('bridge_id'),
+        updates=', '.join(f'{quote(column)} = excluded.{quote(column)}' for column in columns[1:]),
+    )
+    rows = [
+        (pk, *values, screened_at)
+        for pk, *values in zip(pks.tolist(), *(results[name].tolist() for name in measures))
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def run_screening():
+    """Screen the whole network and store the results. Returns a summary dict."""
+    started = time.perf_counter()
+    # Stamped before reading, so edits made while screening count as newer.
+    screened_at = timezone.now()
+    network = load_network()
+    if network is None:
+        return {'bridges': 0, 'over_threshold': 0, 'compute_seconds': 0.0, 'seconds': 0.0}
+    results = screen(network)
+    computed = time.perf_counter()
+
+    store(network['pk'], results, screened_at)
+
+    return {
+        'bridges': len(network['pk']),
+        'over_threshold': int((results['load_index'] > DEFAULT_THRESHOLD).sum()),
+        'compute_seconds': round(computed - started, 4),
+        'seconds': round(time.perf_counter() - started, 4),
+    }
+
+
+def ensure_current():
+    """Queue a screening run if the stored results are missing or older than the inventory.
+
+    Returns the queued or already running ``screening.run`` job, or None if
+    the results are current (or there are no bridges).
+    """
+    changed = [
+        model.objects.aggregate(latest=Max('updated_at'))['latest'] for model in (Bridge, TrafficData)
+    ]
+    changed = max(filter(None, changed), default=None)
+    if changed is None:
+        return None
+    screened = LoadScreening.objects.aggregate(oldest=Min('screened_at'))['oldest']
+    if screened is not None and screened >= changed:
+        return None
+    pending = Job.objects.filter(
+        task='screening.run', status__in=[Job.STATUS_QUEUED, Job.STATUS_RUNNING],
+    ).first()
+    return pending or enqueue('screening.run', priority=5)
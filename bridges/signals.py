@@ -0,0 +1,129 @@
+"""
+Model signal handlers, connected in ``BridgesConfig.ready()``.
+"""
+import contextvars
+import functools
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+from . import analytics, auth, cube, live, sync
+from .models import Bridge, MaintenanceRecord, Route, TrafficData
+
+_suppressed = contextvars.ContextVar('bridges_inventory_signals_suppressed', default=False)
+
+
+@contextmanager
+def inventory_signals_suppressed():
+    """Skip the sync, analytics and cube handlers for bulk operations.
+
+    For code that does the equivalent bookkeeping once per batch instead of
+    once per row (see ``bridges/archive.py``).
+    """
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def _unless_suppressed(handler):
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not _suppressed.get():
+            handler(*args, **kwargs)
+    return wrapper
+
+
+@_unless_suppressed
+def record_sync_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        # Fixture loading; the rows are logged by whatever loads them.
+        return
+    sync.log_changes(sender, [instance.pk])
+
+
+@_unless_suppressed
+def record_sync_delete(sender, instance, **kwargs):
+    sync.log_changes(sender, [instance.pk], deleted=True)
+
+
+@_unless_suppressed
+def invalidate_analytics(sender, **kwargs):
+    analytics.invalidate()
+
+
+@_unless_suppressed
+def remember_cube_cell(sender, instance, raw=False, **kwargs):
+    # A bridge edit can move it to another cell; the old one must be refreshed too.
+    instance._previous_cube_key = None if raw or instance.pk is None else cube.key_for_bridge(instance.pk)
+
+
+@_unless_suppressed
+def refresh_bridge_cube_cell(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_cube_key', None)
+    current = cube.cell_key(instance.bridge_type, instance.material, instance.year_built, instance.lanes)
+    cube.mark_dirty(previous, current)
+
+
+@_unless_suppressed
+def refresh_related_cube_cell(sender, instance, **kwargs):
+    cube.mark_dirty(cube.key_for_bridge(instance.bridge_id))
+
+
+@_unless_suppressed
+def notify_live_dashboards(sender, **kwargs):
+    transaction.on_commit(live.notify)
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    auth.invalidate_user(instance.pk)
+
+
+def invalidate_cached_permissions(sender, **kwargs):
+    auth.invalidate_permissions()
+
+
+def invalidate_cached_membership(sender, instance, reverse, action, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # Changed from the group side; several users may be affected.
+        auth.invalidate_permissions()
+    else:
+        auth.invalidate_user(instance.pk)
+
+
+def connect():
+    for model in sync.SYNC_MODELS.values():
+        post_save.connect(record_sync_save, sender=model, dispatch_uid=f'sync_save_{model._meta.model_name}')
+        post_delete.connect(record_sync_delete, sender=model, dispatch_uid=f'sync_delete_{model._meta.model_name}')
+    for model in (*sync.SYNC_MODELS.values(), Route):
+        post_save.connect(invalidate_analytics, sender=model, dispatch_uid=f'analytics_save_{model._meta.model_name}')
+        post_delete.connect(invalidate_analytics, sender=model, dispatch_uid=f'analytics_delete_{model._meta.model_name}')
+
+    pre_save.connect(remember_cube_cell, sender=Bridge, dispatch_uid='cube_remember_bridge')
+    post_save.connect(refresh_bridge_cube_cell, sender=Bridge, dispatch_uid='cube_save_bridge')
+    post_delete.connect(refresh_bridge_cube_cell, sender=Bridge, dispatch_uid='cube_delete_bridge')
+    for model in (TrafficData, MaintenanceRecord):
+        post_save.connect(refresh_related_cube_cell, sender=model, dispatch_uid=f'cube_save_{model._meta.model_name}')
+        post_delete.connect(refresh_related_cube_cell, sender=model, dispatch_uid=f'cube_delete_{model._meta.model_name}')
+
+    for model in sync.SYNC_MODELS.values():
+        post_save.connect(notify_live_dashboards, sender=model, dispatch_uid=f'live_save_{model._meta.model_name}')
+        post_delete.connect(notify_live_dashboards, sender=model, dispatch_uid=f'live_delete_{model._meta.model_name}')
+
+    User = get_user_model()
+    post_save.connect(invalidate_cached_user, sender=User, dispatch_uid='auth_save_user')
+    post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid='auth_delete_user')
+    m2m_changed.connect(invalidate_cached_membership, sender=User.groups.through, dispatch_uid='auth_user_groups')
+    m2m_changed.connect(
+        invalidate_cached_membership, sender=User.user_permissions.through, dispatch_uid='auth_user_permissions',
+    )
+    m2m_changed.connect(invalidate_cached_permissions, sender=Group.permissions.through, dispatch_uid='auth_group_permissions')
+    for model in (Group, Permission):
+        post_save.connect(invalidate_cached_permissions, sender=model, dispatch_uid=f'auth_save_{model._meta.model_name}')
+        post_delete.connect(invalidate_cached_permissions, sender=model, dispatch_uid=f'auth_delete_{model._meta.model_name}')
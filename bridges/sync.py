@@ -0,0 +1,136 @@
+"""
+Delta sync for offline field tablets.
+
+Every save/delete of a synced model is recorded in ``SyncChange`` (see the
+signal handlers in ``bridges/signals.py``). A client keeps the highest ``seq``
+it has applied as its watermark and asks for everything after it; the answer
+is gzip-compressed JSON Lines, one object per line, in ``seq`` order:
+
+    {"seq": 41, "model": "bridge", "id": 3, "op": "upsert", "data": {...}}
+    {"seq": 42, "model": "maintenancerecord", "id": 17, "op": "delete"}
+
+Writes that bypass model signals (``bulk_create``, ``QuerySet.update``) must
+call ``log_changes()`` themselves or tablets will not see them.
+
+A watermark is only safe if sequence numbers become visible in ``seq`` order:
+a tablet that has seen 101 will never ask for 100 again. SQLite gives us that
+for free, because it lets one transaction write at a time. On PostgreSQL,
+log writers take a transaction-level advisory lock before drawing numbers,
+so a later writer waits until the earlier one has committed or rolled back.
+"""
+import gzip
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Bridge, TrafficData, MaintenanceRecord, SyncChange
+
+SYNC_MODELS = {
+    model._meta.model_name: model
+    for model in (Bridge, TrafficData, MaintenanceRecord)
+}
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+
+# Arbitrary key for pg_advisory_xact_lock(); held until the writer commits.
+LOG_LOCK_KEY = 0x73796e63
+
+
+def log_changes(model, object_ids, deleted=False):
+    """Give each object a fresh sequence number, replacing its previous log row."""
+    object_ids = list(dict.fromkeys(object_ids))
+    if not object_ids:
+        return
+    model_name = model._meta.model_name
+    now = timezone.now()
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            _upsert_postgresql(model_name, object_ids, deleted, now)
+        else:
+            # Only one SQLite transaction can be writing, so nothing can
+            # slip in between the DELETE and the INSERT.
+            SyncChange.objects.filter(model=model_name, object_id__in=object_ids).delete()
+            SyncChange.objects.bulk_create([
+                SyncChange(model=model_name, object_id=pk, deleted=deleted, changed_at=now)
+                for pk in object_ids
+            ], batch_size=500)
+
+
+def _upsert_postgresql(model_name, object_ids, deleted, now, batch_size=500):
+    """One INSERT ... ON CONFLICT per batch; existing rows get a new ``seq``."""
+    table = SyncChange._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [LOG_LOCK_KEY])
+        for start in range(0, len(object_ids), batch_size):
+            batch = object_ids[start:start + batch_size]
+            cursor.execute(
+                f"""
+                INSERT INTO {connection.ops.quote_name(table)} (model, object_id, deleted, changed_at)
+                VALUES {', '.join(['(%s, %s, %s, %s)'] * len(batch))}
+                ON CONFLICT (model, object_id) DO UPDATE SET
+                    seq = nextval(pg_get_serial_sequence(%s, 'seq')),
+                    deleted = EXCLUDED.deleted,
+                    changed_at = EXCLUDED.changed_at
+                """,
+                [value for pk in batch for value in (model_name, pk, deleted, now)] + [table],
+            )
+
+
+def latest_seq():
+    return SyncChange.objects.order_by('-seq').values_list('seq', flat=True).first() or 0
+
+
+def changes_since(since, limit=DEFAULT_PAGE_SIZE):
+    """Return ``(records, next_since, has_more)`` for one page after ``since``.
+
+    Objects are fetched with one query per model, whatever the page size.
+    """
+    page = list(
+        SyncChange.objects.filter(seq__gt=since)
+        .order_by('seq')
+        .values_list('seq', 'model', 'object_id', 'deleted')[:limit + 1]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    wanted = {}
+    for seq, model_name, object_id, deleted in page:
+        if not deleted:
+            wanted.setdefault(model_name, []).append(object_id)
+
+    rows = {}
+    for model_name, ids in wanted.items():
+        model = SYNC_MODELS.get(model_name)
+        if model is None:
+            continue
+        for row in model.objects.filter(pk__in=ids).values():
+            rows[(model_name, row['id'])] = row
+
+    records = []
+    for seq, model_name, object_id, deleted in page:
+        data = rows.get((model_name, object_id))
+        record = {'seq': seq, 'model': model_name, 'id': object_id}
+        if deleted or data is None:
+            record['op'] = 'delete'
+        else:
+            record['op'] = 'upsert'
+            record['data'] = data
+        records.append(record)
+
+    next_since = page[-1][0] if page else since
+    return records, next_since, has_more
+
+
+def encode_jsonl(records, compress=True):
+    body = ''.join(
+        json.dumps(record, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n'
+        for record in records
+    ).encode('utf-8')
+    if compress:
+        # mtime=0 keeps identical pages byte-identical.
+        body = gzip.compress(body, compresslevel=6, mtime=0)
+    return body
@@ -0,0 +1,66 @@
+"""
+Background tasks run by ``manage.py run_workers``.
+
+Each task receives the ``Job`` row first so it can call ``job.set_progress()``;
+the return value must be JSON-serialisable and is stored on ``Job.result``.
+Keep heavy imports inside the task bodies so loading this module stays cheap.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .jobs import task
+from .models import Job
+
+
+@task('jobs.purge_finished')
+def purge_finished_jobs(job, days=30):
+    """Delete succeeded jobs older than ``days``; failed jobs are kept for inspection."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(
+        status=Job.STATUS_SUCCEEDED,
+        finished_at__lt=cutoff,
+    ).delete()
+    return {'deleted': deleted}
+
+
+@task('photos.thumbnails')
+def photo_thumbnails(job, blob_id):
+    from .photos import generate_thumbnails_for_id
+
+    generate_thumbnails_for_id(blob_id)
+    return {'blob_id': blob_id}
+
+
+@task('routes.normalize')
+def normalize_routes(job, batch_size=500):
+    from .routes import normalize_routes
+
+    return {'updated': normalize_routes(batch_size=batch_size)}
+
+
+@task('screening.run')
+def screen_traffic_loading(job):
+    from .screening import run_screening
+
+    return run_screening()
+
+
+@task('cube.rebuild')
+def rebuild_condition_cube(job):
+    from .cube import rebuild
+
+    return {'cells': rebuild()}
+
+
+@task('maintenance.archive')
+def archive_maintenance(job, older_than_days=None, batch_size=500):
+    from .archive import archivable, archive_completed
+
+    total = archivable(older_than_days).count()
+    archived = archive_completed(
+        older_than_days=older_than_days,
+        batch_size=batch_size,
+        progress=lambda count: job.set_progress(100 * count / total, f'{count} of {total} archived'),
+    )
+    return {'archived': archived}
@@ -1,3 +1,782 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.forms import BaseForm
+from django.test import LiveServerTestCase, RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import archive, cube, forecasting, forms, jobs, live, loadtest, photos, screening, sync
+from .fileserve import parse_range, serve_file
+from .models import (
+    ArchivedMaintenanceRecord, Bridge, ConditionCubeBuild, ConditionCubeCell, Job, LoadScreening, MaintenanceRecord,
+    PhotoBlob, SyncChange,
+)
+from .routes import normalize_route_name
+from .sampledata import create_sample_network
+
+
+def failing_task(job):
+    raise RuntimeError('boom')
+
+
+def reclaimed_task(job):
+    """The first attempt is given up as stale, claimed and finished again before it returns."""
+    if job.attempts == 1:
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        jobs.requeue_stale()
+        jobs.run_job(jobs.claim_next('w2'))
+    return {'attempt': job.attempts}
+
+
+@mock.patch.dict(jobs._registry, {
+    'tests.fail': failing_task,
+    'tests.echo': lambda job, **kwargs: kwargs,
+    'tests.unserialisable': lambda job: {'when': timezone.now()},
+    'tests.reclaimed': reclaimed_task,
+})
+class JobQueueTests(TestCase):
+    def test_claim_order_on_both_code_paths(self):
+        for skip_locked in (False, True):
+            with self.subTest(skip_locked=skip_locked), \
+                    mock.patch.object(connection.features, 'has_select_for_update_skip_locked', skip_locked):
+                Job.objects.all().delete()
+                low = jobs.enqueue('tests.echo')
+                high = jobs.enqueue('tests.echo', priority=5)
+                jobs.enqueue('tests.echo', priority=9, delay=timedelta(hours=1))
+
+                claimed = [jobs.claim_next('w1'), jobs.claim_next('w2'), jobs.claim_next('w3')]
+                self.assertEqual([job.pk for job in claimed[:2]], [high.pk, low.pk])
+                self.assertIsNone(claimed[2])
+                self.assertEqual((claimed[0].status, claimed[0].locked_by, claimed[0].attempts),
+                                 (Job.STATUS_RUNNING, 'w1', 1))
+
+    def test_failures_back_off_then_fail(self):
+        job = jobs.enqueue('tests.fail', max_attempts=3)
+        delays = []
+        for _ in range(3):
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            started = timezone.now()
+            with self.assertLogs('bridges.jobs', 'ERROR'):
+                job = jobs.run_job(jobs.claim_next('w1'))
+            delays.append(round((job.run_after - started).total_seconds()))
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIn('RuntimeError: boom', job.error)
+        self.assertEqual(delays[:2], [jobs.RETRY_BACKOFF_BASE, jobs.RETRY_BACKOFF_BASE * 2])
+
+    def test_unknown_task_fails_without_retrying(self):
+        jobs.enqueue('tests.missing')
+        with self.assertLogs('bridges.jobs', 'ERROR'):
+            job = jobs.run_job(jobs.claim_next('w1'))
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 1))
+        self.assertIn('UnknownTask', job.error)
+
+    def test_stale_jobs_are_requeued_until_out_of_attempts(self):
+        retry = jobs.enqueue('tests.echo', max_attempts=3)
+        exhausted = jobs.enqueue('tests.echo', max_attempts=3)
+        fresh = jobs.enqueue('tests.echo')
+        Job.objects.filter(pk=retry.pk).update(status=Job.STATUS_RUNNING, attempts=1)
+        Job.objects.filter(pk=exhausted.pk).update(status=Job.STATUS_RUNNING, attempts=3)
+        Job.objects.filter(pk__in=[retry.pk, exhausted.pk]).update(locked_at=timezone.now() - timedelta(hours=1))
+        Job.objects.filter(pk=fresh.pk).update(status=Job.STATUS_RUNNING, attempts=1, locked_at=timezone.now())
+
+        self.assertEqual(jobs.requeue_stale(), (1, 1))
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[retry.pk], Job.STATUS_QUEUED)
+        self.assertEqual(statuses[exhausted.pk], Job.STATUS_FAILED)
+        self.assertEqual(statuses[fresh.pk], Job.STATUS_RUNNING)
+
+    def test_progress_keeps_a_long_job_from_going_stale(self):
+        jobs.enqueue('tests.echo')
+        job = jobs.claim_next('w1')
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        job.set_progress(50, 'Halfway')
+        self.assertEqual(jobs.requeue_stale(), (0, 0))
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.STATUS_RUNNING)
+
+    def test_a_reclaimed_job_keeps_the_newer_outcome(self):
+        jobs.enqueue('tests.reclaimed')
+        with self.assertLogs('bridges.jobs', 'WARNING') as logs:
+            jobs.run_job(jobs.claim_next('w1'))
+        self.assertIn('outcome is discarded', logs.output[0])
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.result, job.attempts), (Job.STATUS_SUCCEEDED, {'attempt': 2}, 2))
+
+    def test_unserialisable_result_fails_the_job_not_the_worker(self):
+        jobs.enqueue('tests.unserialisable')
+        with self.assertLogs('bridges.jobs', 'ERROR'):
+            jobs.run_job(jobs.claim_next('w1'))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (Job.STATUS_FAILED, 1, ''))
+        self.assertIn('InvalidResult', job.error)
+
+
+class FileServeTests(SimpleTestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.write(handle, bytes(range(100)))
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        self.factory = RequestFactory()
+
+    def serve(self, **headers):
+        return serve_file(self.factory.get('/', headers=headers), self.path, 'image/jpeg')
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=10-19', 100), (10, 19))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-5', 100), (95, 99))
+        self.assertEqual(parse_range('bytes=50-500', 100), (50, 99))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 100))
+        self.assertIs(parse_range('bytes=100-', 100), False)
+        self.assertIs(parse_range('bytes=-0', 100), False)
+
+    def test_partial_content(self):
+        response = self.serve(Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+
+    def test_unsatisfiable_range(self):
+        response = self.serve(Range='bytes=200-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_if_range_only_applies_to_the_same_file(self):
+        etag = self.serve()['ETag']
+        self.assertEqual(self.serve(Range='bytes=0-9', If_Range=etag).status_code, 206)
+        stale = self.serve(Range='bytes=0-9', If_Range='"0-0"')
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(len(b''.join(stale.streaming_content)), 100)
+
+    def test_not_modified(self):
+        first = self.serve()
+        self.assertEqual(self.serve(If_None_Match=first['ETag']).status_code, 304)
+        self.assertEqual(self.serve(If_Modified_Since=first['Last-Modified']).status_code, 304)
+
+
+def image_upload(name, size, mode='RGB', image_format='JPEG'):
+    """A real image file, as a browser would upload it."""
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new(mode, size, (200, 120, 40, 128)[:len(mode)]).save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{image_format.lower()}')
+
+
+class PhotoUploadTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = self.settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def upload(self, content=b'same pixels'):
+        return SimpleUploadedFile('photo.png', content, content_type='image/png')
+
+    def assert_thumbnails(self, blob, longest_edge):
+        from PIL import Image
+
+        for size, edge in photos.THUMBNAIL_SIZES.items():
+            with default_storage.open(photos.thumbnail_name(blob.sha256, size)) as fh, Image.open(fh) as thumb:
+                self.assertEqual(thumb.format, 'JPEG')
+                self.assertEqual(max(thumb.size), min(edge, longest_edge))
+        blob.refresh_from_db()
+        self.assertTrue(blob.thumbnails_ready)
+
+    def test_thumbnails_for_jpeg_and_transparent_png(self):
+        for upload, longest_edge in [
+            (image_upload('deck.jpg', (2000, 1500)), 2000),
+            (image_upload('pier.png', (600, 300), 'RGBA', 'PNG'), 600),
+        ]:
+            with self.subTest(upload.name):
+                blob, _ = photos.store_upload(upload)
+                photos.generate_thumbnails(blob)
+                self.assert_thumbnails(blob, longest_edge)
+
+    def test_upload_attaches_the_photo_and_queues_thumbnails(self):
+        bridge = create_sample_network(1, maintenance_per_bridge=0)[0]
+        User.objects.create_user('inspector', password='secret')
+        self.client.login(username='inspector', password='secret')
+
+        response = self.client.post(reverse('photo_create', args=[bridge.pk]), {
+            'image': image_upload('deck.jpg', (1600, 1200)), 'caption': 'Spalling on pier 2',
+        })
+        self.assertRedirects(response, reverse('bridge_detail', args=[bridge.pk]))
+        attachment = bridge.photos.get()
+        self.assertEqual((attachment.caption, attachment.original_filename), ('Spalling on pier 2', 'deck.jpg'))
+        self.assertEqual(attachment.uploaded_by.username, 'inspector')
+        self.assertEqual((attachment.blob.width, attachment.blob.height, attachment.blob.content_type),
+                         (1600, 1200, 'image/jpeg'))
+        self.assertFalse(attachment.blob.thumbnails_ready)
+
+        jobs.load_tasks()
+        self.assertEqual(jobs.run_job(jobs.claim_next('w1')).status, Job.STATUS_SUCCEEDED)
+        self.assert_thumbnails(attachment.blob, 1600)
+        response = self.client.get(reverse('photo_file', args=[attachment.blob.sha256, 'sm']))
+        self.assertEqual(response.status_code, 200)
+
+    def test_identical_uploads_share_one_blob(self):
+        blob, created = photos.store_upload(self.upload())
+        again, created_again = photos.store_upload(self.upload())
+        other, _ = photos.store_upload(self.upload(b'other pixels'))
+
+        self.assertEqual((created, created_again), (True, False))
+        self.assertEqual(again.pk, blob.pk)
+        self.assertNotEqual(other.pk, blob.pk)
+        self.assertEqual(PhotoBlob.objects.count(), 2)
+        self.assertEqual(Job.objects.filter(task='photos.thumbnails').count(), 2)
+        stored = [name for _, _, files in os.walk(settings.MEDIA_ROOT) for name in files]
+        self.assertEqual(len(stored), 2)
+
+
+class SyncTests(TestCase):
+    def setUp(self):
+        self.bridges = create_sample_network(5, maintenance_per_bridge=2)
+
+    def pull(self, since, limit=sync.DEFAULT_PAGE_SIZE):
+        """Every record after ``since``, page by page like a tablet."""
+        records, more = [], True
+        while more:
+            page, since, more = sync.changes_since(since, limit)
+            records += page
+        return records, since
+
+    def test_pages_cover_the_log_once_in_seq_order(self):
+        records, watermark = self.pull(0, limit=4)
+        self.assertEqual(len(records), 5 + 5 + 10)
+        seqs = [record['seq'] for record in records]
+        self.assertEqual(seqs, sorted(set(seqs)))
+        self.assertEqual(watermark, sync.latest_seq())
+        self.assertEqual(sync.changes_since(watermark), ([], watermark, False))
+
+    def test_delete_leaves_a_tombstone(self):
+        watermark = sync.latest_seq()
+        record = MaintenanceRecord.objects.first()
+        pk = record.pk
+        record.delete()
+        records, _ = self.pull(watermark)
+        self.assertEqual(records, [
+            {'seq': sync.latest_seq(), 'model': 'maintenancerecord', 'id': pk, 'op': 'delete'},
+        ])
+        self.assertTrue(SyncChange.objects.get(model='maintenancerecord', object_id=pk).deleted)
+
+    def test_changed_then_deleted_is_sent_once_as_a_delete(self):
+        watermark = sync.latest_seq()
+        bridge = Bridge.objects.select_related('traffic').get(pk=self.bridges[0].pk)
+        pk, traffic_pk = bridge.pk, bridge.traffic.pk
+        bridge.condition_notes = 'Re-inspected'
+        bridge.save()
+        bridge.delete()
+
+        records, _ = self.pull(watermark)
+        ops = {(record['model'], record['id']): record['op'] for record in records}
+        self.assertEqual(len(ops), len(records))
+        self.assertEqual(ops[('bridge', pk)], 'delete')
+        self.assertEqual(ops[('trafficdata', traffic_pk)], 'delete')
+        self.assertEqual(set(ops.values()), {'delete'})
+        self.assertEqual(SyncChange.objects.filter(model='bridge', object_id=pk).count(), 1)
+
+    def test_postgresql_writers_lock_before_taking_numbers(self):
+        executed = []
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value.execute.side_effect = lambda sql, params: executed.append(sql)
+        with mock.patch.object(sync, 'connection') as connection_:
+            connection_.vendor = 'postgresql'
+            connection_.cursor.return_value = cursor
+            connection_.ops.quote_name = lambda name: f'"{name}"'
+            with mock.patch.object(sync.transaction, 'atomic'):
+                sync.log_changes(Bridge, [1, 2, 1])
+        self.assertIn('pg_advisory_xact_lock', executed[0])
+        self.assertIn('ON CONFLICT (model, object_id) DO UPDATE', executed[1])
+        self.assertEqual(executed[1].count('(%s, %s, %s, %s)'), 2)
+
+
+class RouteNormalisationTests(SimpleTestCase):
+    EXAMPLES = {
+        'CITY-MASVINGO ROAD': 'CITY-MASVINGO ROAD',
+        'CITY-MASVINGO ROAD WITH AN UNDERPASS': 'CITY-MASVINGO ROAD',
+        'City - Masvingo Rd': 'CITY-MASVINGO ROAD',
+        'Harare-Mutare Road (km 12)': 'HARARE-MUTARE ROAD',
+        'ST MARYS RD': 'ST MARYS ROAD',
+        'Samora Machel Ave.': 'SAMORA MACHEL AVENUE',
+        'Seke Rd over Mukuvisi River': 'SEKE ROAD',
+        '': '',
+        None: '',
+    }
+
+    def test_examples(self):
+        for text, expected in self.EXAMPLES.items():
+            with self.subTest(text):
+                self.assertEqual(normalize_route_name(text), expected)
+
+    def test_migration_copy_matches(self):
+        migration = importlib.import_module('bridges.migrations.0005_routes')
+        for text in self.EXAMPLES:
+            self.assertEqual(migration.normalize_route_name(text), normalize_route_name(text))
+
+
+class ConditionCubeTests(TestCase):
+    def cells(self):
+        rows = ConditionCubeCell.objects.order_by(*cube.DIMENSIONS).values(*cube.DIMENSIONS, *cube.MEASURES)
+        return [{key: round(value, 6) if isinstance(value, float) else value for key, value in row.items()}
+                for row in rows]
+
+    def test_incremental_refresh_matches_full_rebuild(self):
+        bridges = create_sample_network(40)
+        cube.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            moved = bridges[0]
+            moved.material, moved.lanes, moved.year_built = 'STEEL', 6, 1951
+            moved.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            traffic = bridges[1].traffic
+            traffic.heavy_vehicles += 500
+            traffic.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            MaintenanceRecord.objects.create(
+                bridge=bridges[2], action_type='MAJOR_REPAIR', description='Deck', cost=1200,
+                scheduled_date=date.today(), completed_date=date.today(), is_completed=True,
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            bridges[3].delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            archive.archive_completed(older_than_days=30)
+
+        incremental = self.cells()
+        cube.rebuild()
+        self.assertEqual(incremental, self.cells())
+
+    def unbuild(self):
+        """The state after deploying the cube migrations."""
+        ConditionCubeCell.objects.all().delete()
+        ConditionCubeBuild.objects.all().delete()
+
+    def test_empty_cube_is_built_by_a_job_not_the_request(self):
+        create_sample_network(5)
+        self.unbuild()
+        User.objects.create_user('inspector', password='secret')
+        self.client.login(username='inspector', password='secret')
+
+        for _ in range(2):
+            response = self.client.get(reverse('condition_cube'))
+            self.assertEqual(response.status_code, 503)
+        self.assertFalse(ConditionCubeCell.objects.exists())
+        job = Job.objects.get(task='cube.rebuild')
+        self.assertEqual(response.json()['job'], reverse('job_status', args=[job.pk]))
+
+        jobs.load_tasks()
+        self.assertEqual(jobs.run_job(jobs.claim_next('w1')).status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(self.client.get(reverse('condition_cube')).status_code, 200)
+
+    def test_writes_before_the_first_build_do_not_pass_for_a_complete_cube(self):
+        bridges = create_sample_network(4)
+        self.unbuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            bridges[0].lanes += 1
+            bridges[0].save()
+        self.assertFalse(ConditionCubeCell.objects.exists())
+        User.objects.create_user('inspector', password='secret')
+        self.client.login(username='inspector', password='secret')
+
+        self.assertEqual(self.client.get(reverse('condition_cube')).status_code, 503)
+        jobs.load_tasks()
+        jobs.run_job(jobs.claim_next('w1'))
+        response = self.client.get(reverse('condition_cube'))
+        self.assertEqual(response.json()['totals']['bridge_count'], 4)
+
+
+class ScreeningTests(SimpleTestCase):
+    def network(self, **columns):
+        """One bridge per column entry; unspecified inputs are a nominal two-lane beam bridge."""
+        count = len(next(iter(columns.values())))
+        network = {
+            'pk': np.arange(count),
+            'heavy': np.full(count, 2 * screening.REFERENCE_HEAVY_PER_LANE),
+            'small': np.full(count, 1000.0),
+            'lanes': np.full(count, 2.0),
+            'width': np.full(count, 2 * screening.REFERENCE_LANE_WIDTH),
+            'length': np.full(count, screening.REFERENCE_SPAN),
+            'bridge_type': np.array(['BEAM_COMPOSITE'] * count),
+            'material': np.array(['STEEL_CONCRETE'] * count),
+            'ratings': np.full((4, count), 5.0),
+        }
+        for name, values in columns.items():
+            network[name] = np.array(values, dtype=network[name].dtype)
+        return network
+
+    def test_nominal_bridge_scores_one(self):
+        results = screening.screen(self.network(lanes=[2]))
+        self.assertAlmostEqual(results['load_index'][0], 1.0)
+        self.assertAlmostEqual(results['heavy_per_lane'][0], screening.REFERENCE_HEAVY_PER_LANE)
+
+    def test_no_traffic(self):
+        results = screening.screen(self.network(heavy=[0, 0], small=[0, 500]))
+        self.assertEqual(results['load_index'].tolist(), [0.0, 0.0])
+        self.assertEqual(results['heavy_share'].tolist(), [0.0, 0.0])
+
+    def test_weakest_rating_and_unrated_bridges(self):
+        ratings = np.array([[5, 5, np.nan], [1, 3, np.nan], [5, 5, np.nan], [5, 5, np.nan]])
+        results = screening.screen(self.network(lanes=[2, 2, 2], ratings=ratings))
+        condition = [screening.CONDITION_FLOOR, 0.75, 0.5 + 0.5 * (screening.UNRATED_RATING - 1) / 4]
+        np.testing.assert_allclose(results['capacity'], condition)
+        np.testing.assert_allclose(results['load_index'], [1 / c for c in condition])
+
+    def test_single_and_missing_lanes(self):
+        results = screening.screen(self.network(lanes=[1, 0], width=[screening.REFERENCE_LANE_WIDTH] * 2))
+        # All the heavy traffic on one lane, and a lane count of 0 treated as 1.
+        np.testing.assert_allclose(results['heavy_per_lane'], [2 * screening.REFERENCE_HEAVY_PER_LANE] * 2)
+        np.testing.assert_allclose(results['load_index'], [2.0, 2.0])
+
+    def test_default_threshold_flags_a_minority_of_the_sample_network(self):
+        # create_sample_network()'s traffic, geometry and ratings distributions.
+        rng = np.random.default_rng(0)
+        count = 5000
+        network = self.network(
+            heavy=rng.integers(0, 3001, count), small=rng.integers(100, 20001, count),
+            lanes=rng.integers(1, 7, count), width=rng.integers(700, 2501, count) / 100,
+            length=rng.integers(15000, 250001, count) / 1000,
+            ratings=rng.integers(1, 6, (4, count)),
+        )
+        over = (screening.screen(network)['load_index'] > screening.DEFAULT_THRESHOLD).mean()
+        self.assertLess(over, 0.2)
+
+
+class ScreeningEndpointTests(TestCase):
+    def setUp(self):
+        self.bridges = create_sample_network(10, maintenance_per_bridge=0)
+        User.objects.create_user('inspector', password='secret')
+        self.client.login(username='inspector', password='secret')
+        self.url = reverse('screening_over_threshold')
+        jobs.load_tasks()
+
+    def test_missing_or_outdated_results_queue_a_screening(self):
+        for _ in range(2):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 503)
+        job = Job.objects.get(task='screening.run')
+        self.assertEqual(response.json()['job'], reverse('job_status', args=[job.pk]))
+
+        jobs.run_job(jobs.claim_next('w1'))
+        response = self.client.get(self.url, {'threshold': 0})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], LoadScreening.objects.filter(load_index__gt=0).count())
+
+        traffic = self.bridges[0].traffic
+        traffic.heavy_vehicles += 100
+        traffic.save()
+        self.assertEqual(self.client.get(self.url).status_code, 503)
+        self.assertEqual(Job.objects.filter(task='screening.run', status=Job.STATUS_QUEUED).count(), 1)
+
+    def test_threshold_must_be_finite(self):
+        for threshold in ('nan', 'inf', '-inf', 'high'):
+            with self.subTest(threshold=threshold):
+                self.assertEqual(self.client.get(self.url, {'threshold': threshold}).status_code, 400)
+
+
+class ForecastTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_sample_network(60, maintenance_per_bridge=0)
+        Bridge.objects.filter(pk=Bridge.objects.order_by('pk')[0].pk).update(
+            deck_rating=None, girders_rating=None, piers_rating=None, abutment_rating=None
+        )
+
+    def setUp(self):
+        self.result = forecasting.forecast(horizons=range(1, 31), start_year=2024)
+        self.horizons = self.result['horizons']
+
+    def test_bridge_count_is_conserved(self):
+        self.assertEqual(self.result['rated_bridges'], 59)
+        self.assertEqual(self.result['unrated_bridges'], 1)
+        for horizon in self.horizons:
+            self.assertAlmostEqual(sum(horizon['distribution'].values()), 59, delta=0.5)
+
+    def test_horizon_zero_is_the_current_condition_mix(self):
+        current = Counter(
+            bridge.condition_category.upper().replace(' ', '_') for bridge in Bridge.objects.all()
+        )
+        self.assertEqual(self.horizons[0]['years'], 0)
+        self.assertEqual(
+            self.horizons[0]['distribution'],
+            {state.lower(): float(current[state]) for state in forecasting.STATES},
+        )
+
+    def test_fair_or_poor_never_decreases(self):
+        fair_or_poor = [horizon['fair_or_poor'] for horizon in self.horizons]
+        self.assertEqual(len(fair_or_poor), 31)
+        self.assertEqual(fair_or_poor, sorted(fair_or_poor))
+        self.assertGreater(fair_or_poor[-1], fair_or_poor[0])
+
+
+# Generous enough for a slow CI machine; a worker boot takes well under half
+# of this today. Importing NumPy/Pillow/Matplotlib at boot fails regardless.
+IMPORT_TIME_BUDGET_MS = 1500
+
+
+class ImportTimeTests(SimpleTestCase):
+    def test_worker_boot_within_budget_and_without_heavy_imports(self):
+        out = StringIO()
+        call_command('import_times', threshold_ms=IMPORT_TIME_BUDGET_MS, stdout=out)
+        self.assertIn('Import time within budget', out.getvalue())
+
+
+class ProductionSettingsTests(SimpleTestCase):
+    def load(self, code='', **env):
+        """Import the production settings in a fresh interpreter, then run ``code``.
+
+        ``None`` unsets an environment variable.
+        """
+        env = {**os.environ, 'DJANGO_SECRET_KEY': 'x', **env}
+        return subprocess.run(
+            [sys.executable, '-c', 'from bridge_inventory import settings_production as s\n' + code],
+            capture_output=True, text=True, cwd=settings.BASE_DIR,
+            env={name: value for name, value in env.items() if value is not None},
+        )
+
+    def test_cache_dir_must_be_private(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, 'cache')
+            self.assertEqual(self.load(DATABASE_URL='sqlite:///db', DJANGO_CACHE_DIR=cache_dir).returncode, 0)
+            os.mkdir(cache_dir)
+            os.chmod(cache_dir, 0o777)
+            result = self.load(DATABASE_URL='sqlite:///db', DJANGO_CACHE_DIR=cache_dir)
+            self.assertIn('ImproperlyConfigured', result.stderr)
+
+    def test_database_url_is_required(self):
+        result = self.load(DATABASE_URL=None, DJANGO_CACHE_DIR='/nonexistent')
+        self.assertIn("KeyError: 'DATABASE_URL'", result.stderr)
+
+    def test_multi_node_keeps_sessions_and_users_out_of_the_local_cache(self):
+        env = {'DATABASE_URL': 'sqlite:///db', 'DJANGO_CACHE_DIR': '/nonexistent'}
+        show = 'print(s.SESSION_ENGINE, *s.AUTHENTICATION_BACKENDS)'
+        self.assertEqual(
+            self.load(show, **env).stdout.split(),
+            ['django.contrib.sessions.backends.cached_db', 'bridges.auth.CachedModelBackend'],
+        )
+        self.assertEqual(
+            self.load(show, DJANGO_MULTI_NODE='1', **env).stdout.split(),
+            ['django.contrib.sessions.backends.db', 'django.contrib.auth.backends.ModelBackend'],
+        )
+        result = self.load(DJANGO_MULTI_NODE='1', DJANGO_SESSION_MODE='cached_db', **env)
+        self.assertIn('ImproperlyConfigured', result.stderr)
+
+
+class CachedAuthTests(TestCase):
+    """Sessions and users come from the cache (cached_db + CachedModelBackend)."""
+
+    def setUp(self):
+        cache.clear()
+        create_sample_network(20)
+        self.user = User.objects.create_user('inspector', password='secret')
+        self.client.login(username='inspector', password='secret')
+
+    def auth_queries(self, url):
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [
+            query['sql'] for query in queries.captured_queries
+            if 'django_session' in query['sql'] or 'auth_user' in query['sql']
+        ]
+
+    def test_warm_requests_skip_session_and_user_queries(self):
+        for name in ('dashboard', 'bridge_list'):
+            with self.subTest(name):
+                self.assertEqual(self.auth_queries(reverse(name)), [])
+
+    def test_user_change_invalidates_cached_user(self):
+        self.auth_queries(reverse('dashboard'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('dashboard')).status_code, 302)
+
+    def test_group_permission_change_invalidates_permissions(self):
+        group = Group.objects.create(name='Engineers')
+        self.user.groups.add(group)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertFalse(user.has_perm('bridges.delete_bridge'))
+
+        group.permissions.add(Permission.objects.get(codename='delete_bridge'))
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.has_perm('bridges.delete_bridge'))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.bridge = create_sample_network(5)[0]
+        User.objects.create_user('inspector', password='secret')
+        self.client.login(username='inspector', password='secret')
+
+    def test_repeat_visit_is_not_modified_until_data_changes(self):
+        url = reverse('bridge_detail', args=[self.bridge.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.bridge.maintenance_records.first().delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since_alone_does_not_hide_a_delete(self):
+        url = reverse('bridge_detail', args=[self.bridge.pk])
+        self.assertNotIn('Last-Modified', self.client.get(url))
+        since = http_date(timezone.now().timestamp() + 60)
+        self.bridge.maintenance_records.first().delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+    def test_list_is_compressed(self):
+        response = self.client.get(reverse('bridge_list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('private', response['Cache-Control'])
+
+
+class StylesheetCoverageTests(SimpleTestCase):
+    """static/css/app.css is written by hand, so check it keeps up with the markup."""
+    TEMPLATE_TAG_RE = re.compile(r'\{%.*?%\}|\{\{.*?\}\}', re.S)
+    # class="..." and className assignments in inline scripts, read with the
+    # template tags blanked out, and the add_class filter inside those tags.
+    CLASS_RE = re.compile(r'''(?:\bclass="|className = ')([^"']*)''')
+    ADD_CLASS_RE = re.compile(r'add_class:"([^"]*)"')
+    STYLE_RE = re.compile(r'<style>(.*?)</style>', re.S)
+    # Font Awesome loads from its CDN in base.html.
+    EXTERNAL_RE = re.compile(r'^fa[srb]?$|^fa-')
+
+    def has_selector(self, css, name):
+        escaped = re.escape(re.sub(r'([:/.\[\]])', r'\\\1', name))
+        return re.search(r'\.' + escaped + r'(?![\w\\-])', css) is not None
+
+    def test_every_class_has_a_rule(self):
+        stylesheet = (settings.BASE_DIR / 'static' / 'css' / 'app.css').read_text()
+        missing = []
+        for path in sorted((settings.BASE_DIR / 'templates').rglob('*.html')):
+            source = path.read_text()
+            css = stylesheet + ''.join(self.STYLE_RE.findall(source))
+            values = self.CLASS_RE.findall(self.TEMPLATE_TAG_RE.sub(' ', source)) + self.ADD_CLASS_RE.findall(source)
+            for value in values:
+                missing += [
+                    f'{path.name}: {name}' for name in value.split()
+                    if not self.EXTERNAL_RE.match(name) and not self.has_selector(css, name)
+                ]
+        for form_class in vars(forms).values():
+            if isinstance(form_class, type) and issubclass(form_class, BaseForm):
+                for field in form_class.base_fields.values():
+                    missing += [
+                        f'{form_class.__name__}: {name}' for name in field.widget.attrs.get('class', '').split()
+                        if not self.has_selector(stylesheet, name)
+                    ]
+        self.assertEqual(missing, [])
+
+    def test_escaped_and_prefixed_names(self):
+        css = '.sm\\:text-sm { } .hover\\:bg-gray-50:hover { } .w-1\\/2 { } .text-sm { }'
+        for name in ('sm:text-sm', 'hover:bg-gray-50', 'w-1/2', 'text-sm'):
+            self.assertTrue(self.has_selector(css, name), name)
+        for name in ('sm', 'text', 'bg-gray-50', 'w-1'):
+            self.assertFalse(self.has_selector(css, name), name)
+
+
+class MaintenanceArchiveTests(TestCase):
+    def setUp(self):
+        self.bridges = create_sample_network(30)
+
+    def test_archiving_keeps_totals_and_history(self):
+        totals = archive.maintenance_totals()
+        _, cube_totals = cube.pivot()
+        history = [record.pk for record in archive.maintenance_history(self.bridges[0])]
+
+        archived = archive.archive_completed(older_than_days=30, batch_size=7)
+
+        self.assertGreater(archived, 0)
+        self.assertEqual(ArchivedMaintenanceRecord.objects.count(), archived)
+        self.assertFalse(archive.archivable(30).exists())
+        self.assertEqual(archive.maintenance_totals(), totals)
+        self.assertEqual(cube.pivot()[1], cube_totals)
+        cube.rebuild()
+        self.assertEqual(cube.pivot()[1], cube_totals)
+        self.assertEqual([record.pk for record in archive.maintenance_history(self.bridges[0])], history)
+
+    def test_records_with_photos_stay_hot(self):
+        record = MaintenanceRecord.objects.filter(pk__in=archive.archivable(30)).first()
+        record.photos.create(bridge=record.bridge, blob=PhotoBlob.objects.create(sha256='0' * 64, size=0))
+        archive.archive_completed(older_than_days=30)
+        self.assertTrue(MaintenanceRecord.objects.filter(pk=record.pk).exists())
+
+
+class LiveDashboardTests(TestCase):
+    async def test_one_computation_fanned_out_to_every_stream(self):
+        bridge = (await sync_to_async(create_sample_network)(5))[0]
+        streams = [live.event_stream() for _ in range(3)]
+        # The test's transaction must not be closed under it.
+        with mock.patch.object(live, 'close_old_connections'):
+            for stream in streams:
+                self.assertIn('event: snapshot', await anext(stream))
+
+            with mock.patch.object(live, 'dashboard_snapshot', wraps=live.dashboard_snapshot) as snapshot:
+                await sync_to_async(MaintenanceRecord.objects.create)(
+                    bridge=bridge, action_type='INSPECTION', description='Live', scheduled_date=date.today(),
+                )
+                live.notify()
+                events = [await asyncio.wait_for(anext(stream), 5) for stream in streams]
+
+        self.assertEqual(snapshot.call_count, 1)
+        for event in events:
+            self.assertIn('event: delta', event)
+            self.assertIn('"total_maintenance_actions": 21', event)
+        for stream in streams:
+            await stream.aclose()
+
+        # Once the last stream has gone the snapshot is dropped rather than
+        # served stale to the next one.
+        task = live.broadcaster._task
+        with mock.patch.object(live, 'close_old_connections'):
+            live.notify()
+            await asyncio.wait_for(task, 5)
+        self.assertIsNone(live.broadcaster._snapshot)
+
+    def test_dashboard_includes_the_stream_script_once(self):
+        User.objects.create_user('inspector', password='secret')
+        self.client.login(username='inspector', password='secret')
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, '<title>Bridge System Dashboard', count=1)
+        self.assertContains(response, 'new EventSource', count=1)
+
+
+class LoadTestTests(LiveServerTestCase):
+    def test_every_scenario_runs_without_errors(self):
+        create_sample_network(20)
+        User.objects.create_user('loadtest', password='secret')
+        # One user: the live server shares a single in-memory database connection.
+        results = loadtest.run(
+            self.live_server_url, 'loadtest', 'secret', loadtest.scenario_data(),
+            clients=1, duration=2, warmup=0, mix=dict.fromkeys(loadtest.SCENARIOS, 1),
+        )
+        self.assertEqual(set(results), {*loadtest.SCENARIOS, 'TOTAL'})
+        self.assertEqual(results['TOTAL']['errors'], 0, results['TOTAL']['failures'])
+        self.assertGreater(MaintenanceRecord.objects.filter(description='Load test').count(), 0)
+
+        slower = {name: dict(stats, p95_ms=stats['p95_ms'] * 2 + 1) for name, stats in results.items()}
+        self.assertEqual(loadtest.compare(results, results, max_regression=10), [])
+        self.assertIn('TOTAL: p95', '; '.join(loadtest.compare(slower, results, max_regression=10)))
+        failing = {name: dict(stats, errors=1) for name, stats in results.items()}
+        self.assertIn('TOTAL: 1 failed requests', '; '.join(loadtest.compare(failing, results, max_regression=10)))
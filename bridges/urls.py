@@ -6,6 +6,7 @@ urlpatterns = [
     # 1. Core Bridge Management
     # ---------------------------
     path('', views.dashboard_view, name='dashboard'),
+    path('live/dashboard/', views.dashboard_events, name='dashboard_events'),
     path('bridges/', views.BridgeListView.as_view(), name='bridge_list'),
     path('bridges/<int:pk>/', views.BridgeDetailView.as_view(), name='bridge_detail'),
     path('bridges/create/', views.BridgeCreateView.as_view(), name='bridge_create'),
@@ -35,4 +36,38 @@ urlpatterns = [
     path('bridges/<int:bridge_pk>/traffic/manage/',
          views.TrafficDataCreateUpdateView.as_view(),
          name='traffic_data_manage'),
+
+    # ---------------------------
+    # 4. Inspection Photos
+    # Files are addressed by content hash; 'size' is 'original' or a thumbnail size.
+    # ---------------------------
+    path('bridges/<int:bridge_pk>/photos/add/',
+         views.PhotoAttachmentCreateView.as_view(),
+         name='photo_create'),
+
+    path('photos/<slug:sha256>/<slug:size>/',
+         views.photo_file,
+         name='photo_file'),
+
+    # ---------------------------
+    # 5. Network Analytics (corridors, load screening, forecasts, condition cube)
+    # ---------------------------
+    path('corridors/', views.corridor_report_view, name='corridor_report'),
+    path('api/screening/over-threshold/',
+         views.screening_over_threshold,
+         name='screening_over_threshold'),
+    path('api/forecast/', views.condition_forecast, name='condition_forecast'),
+    path('api/cube/', views.condition_cube_pivot, name='condition_cube'),
+
+    # ---------------------------
+    # 6. Offline Sync API
+    # Field tablets pull changes after their last seen sequence number.
+    # ---------------------------
+    path('api/sync/', views.sync_changes, name='sync_changes'),
+
+    # ---------------------------
+    # 7. Background Jobs
+    # Pages that enqueue work poll this endpoint instead of blocking a worker.
+    # ---------------------------
+    path('jobs/<int:pk>/', views.job_status, name='job_status'),
 ]
@@ -1,18 +1,77 @@
+import hashlib
+import math
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import get_template
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy, reverse
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Max
 from django.db import transaction
-from .models import Bridge, TrafficData, MaintenanceRecord
-from .forms import BridgeForm, TrafficDataForm, MaintenanceRecordForm
+from .models import (
+    Bridge, TrafficData, MaintenanceRecord, MaintenanceArchiveSummary, Job, PhotoBlob, Route, LoadScreening,
+)
+from .forms import BridgeForm, TrafficDataForm, MaintenanceRecordForm, PhotoAttachmentForm
+from . import analytics, archive, cube, live, photos, sync
+# bridges.screening and bridges.forecasting pull in NumPy; they are imported
+# inside the views that use them so worker boot does not pay for it.
+from .fileserve import serve_file
 from django.views.generic.edit import BaseUpdateView # Import needed if not fully imported above
 
+# --- Conditional GET ---
+
+class ConditionalGetMixin:
+    """Answer repeat visits with 304 Not Modified while the page's data is unchanged.
+
+    ``get_validators()`` returns ``(last_modified, parts)``: the newest
+    timestamp of anything the page shows, and values such as row counts that
+    change on deletes (which leave no newer timestamp behind). Template edits,
+    the user and their CSRF cookie are folded in too. Pages with pending flash
+    messages are always rendered.
+
+    Only an ETag is sent: a Last-Modified date would let a client that sends
+    just If-Modified-Since miss deletes and a change of user.
+    """
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        validators = None if len(messages.get_messages(request)) else self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        last_modified, parts = validators
+        template_mtime = max(
+            os.stat(get_template(name).origin.name).st_mtime for name in ('base.html', self.template_name)
+        )
+        timestamp = int(max(last_modified.timestamp() if last_modified else 0, template_mtime))
+        key = repr((timestamp, request.user.pk, request.META.get('CSRF_COOKIE'), *parts))
+        etag = '"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        # The browser may keep the page but must revalidate it on every visit.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
 # --- Bridge Management Views ---
 
-class BridgeListView(LoginRequiredMixin, ListView):
+class BridgeListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Bridge
     template_name = 'bridges/bridge_list.html'
     context_object_name = 'bridges'
@@ -23,6 +82,7 @@ class BridgeListView(LoginRequiredMixin, ListView):
         queryset = super().get_queryset().select_related('traffic')
         search = self.request.GET.get('search')
         condition = self.request.GET.get('condition')
+        route = self.request.GET.get('route')
         
         if search:
             queryset = queryset.filter(
@@ -30,6 +90,10 @@ class BridgeListView(LoginRequiredMixin, ListView):
                 Q(route__icontains=search)
             )
 
+        if route and route.isdigit():
+            # Indexed foreign key lookup instead of matching route text
+            queryset = queryset.filter(normalized_route_id=route)
+
         if condition:
             # Note: Filtering based on a calculated property like condition_category is inefficient.
             # For a large enterprise system, this calculation should ideally be stored/cached 
@@ -47,14 +111,48 @@ class BridgeListView(LoginRequiredMixin, ListView):
         context['total_bridges'] = Bridge.objects.count()
         context['search_query'] = self.request.GET.get('search', '')
         context['condition_filter'] = self.request.GET.get('condition', '')
+        context['route_filter'] = self.request.GET.get('route', '')
+        context['routes'] = Route.objects.filter(bridges__isnull=False).distinct()
         return context
 
+    def get_validators(self):
+        # The list shows bridges and their traffic data; routes follow bridges.
+        bridges = Bridge.objects.aggregate(updated=Max('updated_at'), count=Count('pk'))
+        traffic = TrafficData.objects.aggregate(updated=Max('updated_at'), count=Count('pk'))
+        stamps = [stamp for stamp in (bridges['updated'], traffic['updated']) if stamp]
+        return max(stamps, default=None), [bridges['count'], traffic['count']]
+
 
-class BridgeDetailView(LoginRequiredMixin, DetailView):
+class BridgeDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     model = Bridge
     template_name = 'bridges/bridge_detail.html'
     context_object_name = 'bridge'
 
+    def get_validators(self):
+        stamps = (
+            Bridge.objects.filter(pk=self.kwargs['pk'])
+            .annotate(
+                traffic_updated=Max('traffic__updated_at'),
+                records_updated=Max('maintenance_records__updated_at'),
+                record_count=Count('maintenance_records', distinct=True),
+                photos_added=Max('photos__created_at'),
+                photo_count=Count('photos', distinct=True),
+                thumbnails_ready=Count('photos', filter=Q(photos__blob__thumbnails_ready=True), distinct=True),
+            )
+            .values(
+                'updated_at', 'traffic_updated', 'records_updated', 'photos_added',
+                'record_count', 'photo_count', 'thumbnails_ready',
+            )
+            .first()
+        )
+        if stamps is None:
+            return None  # get_object() raises the 404
+        last_modified = max(
+            stamps[name] for name in ('updated_at', 'traffic_updated', 'records_updated', 'photos_added')
+            if stamps[name]
+        )
+        return last_modified, [stamps['record_count'], stamps['photo_count'], stamps['thumbnails_ready']]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Pass the traffic data object explicitly
@@ -64,7 +162,18 @@ class BridgeDetailView(LoginRequiredMixin, DetailView):
             context['traffic_data'] = None
             
         # Get all maintenance records for display, perhaps with a separate link for 'All Records'
-        context['maintenance_records'] = self.object.maintenance_records.all()[:5]
+        context['full_history'] = self.request.GET.get('history') == 'all'
+        if context['full_history']:
+            # Includes records moved to the archive table
+            context['maintenance_records'] = archive.maintenance_history(self.object)
+        else:
+            context['maintenance_records'] = self.object.maintenance_records.all()[:5]
+        context['archived_record_count'] = (
+            MaintenanceArchiveSummary.objects.filter(bridge=self.object)
+            .values_list('record_count', flat=True).first() or 0
+        )
+        # Only thumbnails are rendered on this page; originals are opened on demand
+        context['photos'] = self.object.photos.select_related('blob', 'maintenance_record')[:24]
         return context
 
 
@@ -210,63 +319,285 @@ class TrafficDataCreateUpdateView(LoginRequiredMixin, TrafficDataMixin, UpdateVi
         # OR simply:
         # return HttpResponseRedirect(self.get_success_url())
 
-# --- Dashboard and Analytics View (Enhanced) ---
-@login_required
-def dashboard_view(request):
-    total_bridges = Bridge.objects.count()
-    bridges = Bridge.objects.all()
+# --- Inspection Photo Views ---
 
-    # Calculate condition statistics (existing logic)
-    raw_condition_stats = {
-        'excellent': 0, 'very_good': 0, 'good': 0, 'fair': 0, 'poor': 0
-    }
-    for bridge in bridges:
-        # Assuming condition_category is a model field like 'Excellent Condition'
-        category = bridge.condition_category.lower().replace(' ', '_')
-        if category in raw_condition_stats:
-            raw_condition_stats[category] += 1
-
-    # --- FIX: Pre-process condition_stats to include percentage ---
-    processed_condition_stats = {}
-    if total_bridges > 0:
-        for category, count in raw_condition_stats.items():
-            percentage = round((count / total_bridges) * 100, 1)
-            # Store the data in a structure the template can easily read
-            processed_condition_stats[category] = {
-                'count': count,
-                'percentage': percentage, # Storing as a number (e.g., 25.5)
-            }
+class PhotoAttachmentCreateView(LoginRequiredMixin, CreateView):
+    form_class = PhotoAttachmentForm
+    template_name = 'bridges/photo_form.html'
+
+    def dispatch(self, request, *args, **kwargs):
+        self.bridge = get_object_or_404(Bridge, pk=self.kwargs['bridge_pk'])
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['bridge'] = self.bridge
+        return kwargs
+
+    def get_initial(self):
+        # Allows linking straight from a maintenance record row
+        return {'maintenance_record': self.request.GET.get('maintenance')}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['bridge'] = self.bridge
+        return context
+
+    def form_valid(self, form):
+        image = form.cleaned_data['image']
+        with transaction.atomic():
+            blob, created = photos.store_upload(image)
+            form.instance.bridge = self.bridge
+            form.instance.blob = blob
+            form.instance.original_filename = image.name[:255]
+            form.instance.uploaded_by = self.request.user
+            response = super().form_valid(form)
+        if created:
+            messages.success(self.request, 'Photo uploaded. Thumbnails will appear shortly.')
+        else:
+            messages.success(self.request, 'Photo attached (identical file already stored).')
+        return response
+
+    def get_success_url(self):
+        return reverse('bridge_detail', kwargs={'pk': self.bridge.pk})
+
+
+# Photos are addressed by content hash, so a given URL never changes and can be
+# cached by the browser indefinitely.
+PHOTO_CACHE_CONTROL = {'private': True, 'max_age': 60 * 60 * 24 * 365, 'immutable': True}
+
+
+@login_required
+def photo_file(request, sha256, size):
+    blob = get_object_or_404(PhotoBlob, sha256=sha256)
+    if size == 'original':
+        path = blob.file.path
+        content_type = blob.content_type
+    elif size in photos.THUMBNAIL_SIZES:
+        path = blob.file.storage.path(photos.thumbnail_name(blob.sha256, size))
+        content_type = 'image/jpeg'
     else:
-        # Handle the case where there are no bridges
-        for category, count in raw_condition_stats.items():
-             processed_condition_stats[category] = {'count': 0, 'percentage': 0.0}
-
-    # --- Traffic Analytics ---
-    traffic_queryset = TrafficData.objects.aggregate(
-        avg_heavy=Avg('heavy_vehicles'),
-        avg_small=Avg('small_vehicles'),
+        raise Http404('Unknown photo size')
+    return serve_file(
+        request, path, content_type,
+        etag=f'"{blob.sha256}-{size}"',
+        cache_control=PHOTO_CACHE_CONTROL,
     )
-    
-    # Calculate combined average daily traffic
-    avg_daily_heavy = traffic_queryset.get('avg_heavy') or 0
-    avg_daily_small = traffic_queryset.get('avg_small') or 0
-    avg_daily_traffic = int(avg_daily_heavy + avg_daily_small)
-    
-    # --- Maintenance Analytics ---
-    total_maintenance_actions = MaintenanceRecord.objects.count()
-    completed_maintenance = MaintenanceRecord.objects.filter(is_completed=True).count()
-    completion_rate = round((completed_maintenance / total_maintenance_actions) * 100, 1) if total_maintenance_actions > 0 else 0
 
-    recent_maintenance = MaintenanceRecord.objects.select_related('bridge').order_by('-created_at')[:5]
 
-    context = {
-        'total_bridges': total_bridges,
-        'condition_stats': processed_condition_stats,  # Use the pre-processed data
-        'recent_maintenance': recent_maintenance,
-        
-        # Analytics Data
-        'avg_daily_traffic': avg_daily_traffic,
-        'total_maintenance_actions': total_maintenance_actions,
-        'completion_rate': completion_rate,
+# --- Static Files ---
+# Used when gunicorn serves the site without a web server in front. Names
+# hashed by ManifestStaticFilesStorage (app.3f2a9c1b7d4e.css) never change
+# content, so they are cached for a year; anything else is revalidated hourly.
+HASHED_STATIC_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+STATIC_CACHE_CONTROL = {'public': True, 'max_age': 60 * 60}
+HASHED_STATIC_CACHE_CONTROL = {'public': True, 'max_age': 60 * 60 * 24 * 365, 'immutable': True}
+
+
+def static_file(request, path):
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    if os.path.isdir(full_path):
+        raise Http404('File not found')
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    cache_control = HASHED_STATIC_CACHE_CONTROL if HASHED_STATIC_RE.search(path) else STATIC_CACHE_CONTROL
+    return serve_file(request, full_path, content_type, cache_control=cache_control)
+
+
+# --- Corridor Analytics ---
+@login_required
+def corridor_report_view(request):
+    corridors = analytics.corridor_report()
+    for corridor in corridors:
+        count = corridor['bridge_count']
+        corridor['condition_mix'] = [
+            {
+                'category': category.lower(),
+                'count': corridor[category.lower()],
+                'percentage': round(corridor[category.lower()] / count * 100, 1) if count else 0,
+            }
+            for category in analytics.CONDITION_CATEGORIES
+        ]
+    return render(request, 'bridges/corridor_report.html', {'corridors': corridors})
+
+
+# --- Traffic Loading Screening ---
+@login_required
+def screening_over_threshold(request):
+    """
+    Bridges whose stored load index exceeds ?threshold= (default
+    screening.DEFAULT_THRESHOLD), worst first. Results come from the last
+    `screen_traffic_loading` run.
+    """
+    from . import screening
+
+    try:
+        threshold = float(request.GET.get('threshold', screening.DEFAULT_THRESHOLD))
+        limit = max(1, min(int(request.GET.get('limit', 100)), 1000))
+    except ValueError:
+        threshold = None
+    if threshold is None or not math.isfinite(threshold):
+        return JsonResponse({'error': "'threshold' must be a finite number and 'limit' an integer"}, status=400)
+
+    # Missing or out-of-date results (after deployment, or after a bridge or
+    # traffic edit): a worker re-screens the network and the client polls
+    # the job until it is done.
+    job = screening.ensure_current()
+    if job is not None:
+        response = JsonResponse({
+            'error': 'The load screening is out of date and is being rerun; retry when the job has finished',
+            'job': reverse('job_status', args=[job.pk]),
+        }, status=503)
+        response['Retry-After'] = '10'
+        return response
+
+    over = LoadScreening.objects.filter(load_index__gt=threshold)
+    rows = over.order_by('-load_index').values(
+        'bridge_id', 'bridge__name', 'load_index', 'demand', 'capacity',
+        'heavy_share', 'heavy_per_lane', 'vehicles_per_lane', 'screened_at',
+    )[:limit]
+    bridges = [
+        {
+            'id': row['bridge_id'],
+            'name': row['bridge__name'],
+            'url': reverse('bridge_detail', kwargs={'pk': row['bridge_id']}),
+            'load_index': round(row['load_index'], 3),
+            'demand': round(row['demand'], 3),
+            'capacity': round(row['capacity'], 3),
+            'heavy_share': round(row['heavy_share'], 3),
+            'heavy_per_lane': round(row['heavy_per_lane'], 1),
+            'vehicles_per_lane': round(row['vehicles_per_lane'], 1),
+            'screened_at': row['screened_at'],
+        }
+        for row in rows
+    ]
+    return JsonResponse({'threshold': threshold, 'count': over.count(), 'bridges': bridges})
+
+
+# --- Condition Forecasting ---
+@login_required
+def condition_forecast(request):
+    """Expected network condition distribution in ?horizons=5,10,20 years."""
+    from . import forecasting
+
+    try:
+        horizons = [int(h) for h in request.GET.get('horizons', '').split(',') if h.strip()]
+    except ValueError:
+        return JsonResponse({'error': "'horizons' must be comma-separated years"}, status=400)
+    horizons = horizons or list(forecasting.DEFAULT_HORIZONS)
+    if not all(0 < h <= forecasting.MAX_HORIZON for h in horizons):
+        return JsonResponse({'error': f'Horizons must be between 1 and {forecasting.MAX_HORIZON} years'}, status=400)
+    return JsonResponse(forecasting.network_forecast(horizons))
+
+
+# --- Condition Cube ---
+@login_required
+def condition_cube_pivot(request):
+    """
+    Drill-down over the precomputed condition cube, e.g.
+    ?group_by=bridge_type,decade&material=STEEL&lanes=2
+    Answers come from ConditionCubeCell, never from scanning bridges.
+    """
+    group_by = [d for d in request.GET.get('group_by', '').split(',') if d]
+    unknown = [d for d in group_by if d not in cube.DIMENSIONS]
+    if unknown:
+        return JsonResponse({'error': f"Unknown dimension(s): {', '.join(unknown)}",
+                             'dimensions': cube.DIMENSIONS}, status=400)
+
+    filters = {}
+    for dimension in cube.DIMENSIONS:
+        value = request.GET.get(dimension)
+        if value:
+            if dimension in ('decade', 'lanes') and not value.isdigit():
+                return JsonResponse({'error': f"'{dimension}' must be an integer"}, status=400)
+            filters[dimension] = value
+
+    # First use after deployment: a worker builds the cube (later writes keep
+    # it current) and the client polls the job until it is done.
+    job = cube.ensure_built()
+    if job is not None:
+        response = JsonResponse({
+            'error': 'The condition cube is being built; retry when the job has finished',
+            'job': reverse('job_status', args=[job.pk]),
+        }, status=503)
+        response['Retry-After'] = '10'
+        return response
+
+    rows, totals = cube.pivot(group_by, **filters)
+    return JsonResponse({'group_by': group_by, 'filters': filters, 'rows': rows, 'totals': totals})
+
+
+# --- Offline Sync API ---
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+
+
+@login_required
+def sync_changes(request):
+    """
+    Returns the Bridge, TrafficData and MaintenanceRecord changes after the
+    client's watermark (?since=<seq>) as JSON Lines. The next watermark and
+    whether another page follows are sent in the X-Sync-Next and X-Sync-More
+    headers; see bridges/sync.py for the record format.
+    """
+    try:
+        since = max(0, int(request.GET.get('since', 0)))
+        limit = int(request.GET.get('limit', sync.DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({'error': "'since' and 'limit' must be integers"}, status=400)
+    limit = max(1, min(limit, sync.MAX_PAGE_SIZE))
+
+    records, next_since, has_more = sync.changes_since(since, limit)
+    compress = bool(ACCEPTS_GZIP_RE.search(request.headers.get('Accept-Encoding', '')))
+
+    response = HttpResponse(sync.encode_jsonl(records, compress=compress), content_type='application/x-ndjson')
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    response['X-Sync-Next'] = str(next_since)
+    response['X-Sync-More'] = '1' if has_more else '0'
+    return response
+
+
+# --- Dashboard and Analytics View (Enhanced) ---
+@login_required
+def dashboard_view(request):
+    # The same statistics the live stream sends (bridges/live.py), so the page
+    # and its updates agree.
+    return render(request, 'bridges/dashboard.html', live.dashboard_snapshot())
+
+
+async def dashboard_events(request):
+    """Server-Sent Events stream of dashboard changes (see bridges/live.py)."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=403)
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would hold a thread per open stream; 204 tells
+        # EventSource not to reconnect, and the page stays static.
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(live.event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Let nginx pass events straight through.
+    return response
+
+
+# --- Background Jobs ---
+@login_required
+def job_status(request, pk):
+    """Polled by pages that enqueued work via bridges.jobs.enqueue()."""
+    job = get_object_or_404(Job, pk=pk)
+    data = {
+        'id': job.pk,
+        'task': job.task,
+        'status': job.status,
+        'progress': job.progress,
+        'progress_message': job.progress_message,
+        'attempts': job.attempts,
+        'finished': job.is_finished,
+        'result': job.result,
     }
-    return render(request, 'bridges/dashboard.html', context)
\ No newline at end of file
+    if job.status == Job.STATUS_FAILED:
+        data['error'] = job.error.strip().splitlines()[-1] if job.error else ''
+    return JsonResponse(data)
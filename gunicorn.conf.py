@@ -0,0 +1,63 @@
+"""
+Gunicorn configuration for bridge_inventory.
+
+    gunicorn -c gunicorn.conf.py
+
+Every setting can be overridden from the environment (GUNICORN_*), or on the
+command line as usual.
+"""
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bridge_inventory.settings_production')
+
+wsgi_app = 'bridge_inventory.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Load Django once in the master and fork workers from it: workers start
+# faster and share the imported code pages copy-on-write.
+preload_app = True
+
+# Views are mostly database-bound, so a few threads per worker keep the CPU
+# busy while queries wait. Workers x threads is the number of requests a node
+# can have in flight.
+#
+# SQLite lets one connection write at a time; extra workers and threads only
+# queue on its lock until requests fail with "database is locked", so an
+# SQLite DATABASE_URL gets one of each unless told otherwise.
+sqlite = os.environ.get('DATABASE_URL', '').startswith('sqlite:')
+workers = int(os.environ.get('GUNICORN_WORKERS', 1 if sqlite else multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1 if sqlite else 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# GUNICORN_ASGI=1 serves the ASGI application on uvicorn workers instead.
+# The live dashboard stream (/live/dashboard/) needs it: an open stream is a
+# coroutine there rather than a worker thread held for hours.
+if os.environ.get('GUNICORN_ASGI', '').lower() in ('1', 'true', 'yes'):
+    wsgi_app = 'bridge_inventory.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+
+# Recycle workers periodically so slow leaks cannot accumulate; the jitter
+# keeps them from all restarting at once.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Heartbeat files on tmpfs rather than a possibly slow disk.
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# An empty GUNICORN_ACCESS_LOG turns the access log off (e.g. for load tests).
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Never share a database connection opened in the master across workers.
+    from django.db import connections
+
+    connections.close_all()